@@ -6,51 +6,25 @@ from telegram.constants import ParseMode
 from telegram.error import TimedOut
 from service_factory import get_yandex_agent_service
 from src.services.logger_service import logger
-from src.services.date_normalizer import normalize_dates_in_text
-from src.services.time_normalizer import normalize_times_in_text
-from src.services.link_converter import convert_yclients_links_in_text
-from src.services.text_formatter import convert_bold_markdown_to_html
+from src.services.reply_formatter import format_reply_text
 from src.services.retry_service import RetryService
 from src.services.call_manager_service import CallManagerException
 from src.services.escalation_service import EscalationService
 
 try:
     from src.config.admin_config import get_telegram_admin_group_id
-    from src.storage import get_topic_storage
-    from src.services.admin_service import AdminPanelService
+    from src.services.admin_service_factory import get_admin_service
 except Exception as e:
     logger.warning(f"Админ-панель недоступна: {e}")
 
+    def get_admin_service(bot):
+        """Админ-панель недоступна - обработчики работают без неё"""
+        return None
+
 load_dotenv()
 
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 
-# Глобальная переменная для админ-панели
-_admin_service = None
-
-def _get_admin_service(bot):
-    """Получает или создает экземпляр AdminPanelService."""
-    global _admin_service
-    if _admin_service is None:
-        try:
-            admin_group_id = get_telegram_admin_group_id()
-            if admin_group_id is None:
-                logger.debug("Админ-панель не настроена (TELEGRAM_ADMIN_GROUP_ID не установлен)")
-                return None
-
-            storage = get_topic_storage()
-            _admin_service = AdminPanelService(
-                bot=bot,
-                storage=storage,
-                admin_group_id=admin_group_id,
-            )
-            logger.debug("Инициализирован AdminPanelService")
-        except Exception as e:
-            logger.warning("Не удалось инициализировать AdminPanelService: %s", str(e))
-            return None
-
-    return _admin_service
-
 async def send_to_agent(message_text, chat_id):
     """Отправка сообщения агенту через LangGraph с retry на нижнем уровне"""
     async def _execute_agent_request():
@@ -109,7 +83,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logger.telegram("Получено сообщение", chat_id)
     
     # Получаем админ-сервис
-    admin_service = _get_admin_service(context.bot)
+    admin_service = get_admin_service(context.bot)
     
     # Отправляем сообщение пользователя в админ-панель (если настроено)
     if admin_service and update.effective_user and update.message:
@@ -151,13 +125,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "manager_alert": escalation_result.get("manager_alert")
         }
     
-    # Нормализуем даты и время в ответе
-    user_message_text = normalize_dates_in_text(user_message_text)
-    user_message_text = normalize_times_in_text(user_message_text)
-    # Преобразуем ссылки yclients.com в HTML-гиперссылки
-    user_message_text = convert_yclients_links_in_text(user_message_text)
-    # Заменяем Markdown жирный текст (**текст**) на HTML теги (<b>текст</b>)
-    user_message_text = convert_bold_markdown_to_html(user_message_text)
+    # Нормализуем даты, время, ссылки yclients.com и жирный текст за один проход
+    user_message_text = format_reply_text(user_message_text)
     await update.message.reply_text(user_message_text, parse_mode=ParseMode.HTML)
 
     # Отправляем ответ AI в админ-панель (если настроено)
@@ -172,10 +141,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Обработка уведомления CallManager
     if isinstance(agent_response, dict) and agent_response.get("manager_alert"):
-        manager_alert = normalize_dates_in_text(agent_response["manager_alert"])
-        manager_alert = normalize_times_in_text(manager_alert)
-        manager_alert = convert_yclients_links_in_text(manager_alert)
-        manager_alert = convert_bold_markdown_to_html(manager_alert)
+        manager_alert = format_reply_text(agent_response["manager_alert"])
         
         # Отправляем уведомление в админ-панель (если настроено)
         if admin_service and update.effective_user:
@@ -232,7 +198,7 @@ async def handle_admin_message(update: Update, context: ContextTypes.DEFAULT_TYP
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
+        admin_service = get_admin_service(context.bot)
         if admin_service is None:
             logger.warning("AdminPanelService не инициализирован. Сообщение не будет обработано.")
             return
@@ -281,7 +247,7 @@ async def handle_manager_command(update: Update, context: ContextTypes.DEFAULT_T
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
+        admin_service = get_admin_service(context.bot)
         if admin_service is None:
             logger.warning("AdminPanelService не инициализирован. Команда /manager не выполнена.")
             return
@@ -310,7 +276,7 @@ async def handle_bot_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
+        admin_service = get_admin_service(context.bot)
         if admin_service is None:
             logger.warning("AdminPanelService не инициализирован. Команда /bot не выполнена.")
             return
@@ -45,7 +45,14 @@ except Exception as e:
     sys.exit(1)
 
 try:
-    from src.api.webhook import webhook, root_post
+    from src.services.admin_service_factory import get_admin_service
+    print("✅ admin_service_factory импортирован", flush=True)
+except Exception as e:
+    print(f"❌ Ошибка импорта admin_service_factory: {e}", flush=True)
+    sys.exit(1)
+
+try:
+    from src.api.webhook import webhook, root_post, wait_pending_updates
     print("✅ webhook импортирован", flush=True)
 except Exception as e:
     print(f"❌ Ошибка импорта webhook: {e}", flush=True)
@@ -100,6 +107,11 @@ async def startup_event():
             print(f"⚠️ Ошибка при установке команд бота: {e}", flush=True)
             logger.warning("Ошибка при установке команд бота: %s", str(e))
         
+        # Админ-панель создаём при старте, чтобы первое сообщение не ждало инициализации хранилища.
+        # Запросы к Telegram идут через application.bot - его HTTP-клиент уже держит пул соединений
+        if get_admin_service(application.bot):
+            print("✅ Админ-панель инициализирована", flush=True)
+        
         logger.success("✅ Приложение Telegram запущено")
     except Exception as e:
         error_msg = f"❌ Ошибка при запуске приложения Telegram: {e}"
@@ -141,6 +153,7 @@ async def startup_event():
 async def shutdown_event():
     """Выполняется при остановке приложения"""
     logger.info("🛑 Остановка бота...")
+    await wait_pending_updates()
     application = get_application()
     if application:
         try:
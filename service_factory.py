@@ -54,3 +54,8 @@ service_factory = ServiceFactory()
 def get_yandex_agent_service() -> YandexAgentService:
     """Получение экземпляра YandexAgentService (совместимость с старым API)"""
     return service_factory.get_yandex_agent_service()
+
+
+def get_escalation_service() -> EscalationService:
+    """Получение общего экземпляра EscalationService"""
+    return service_factory.get_escalation_service()
@@ -2,18 +2,26 @@
 Базовый класс для агентов (Responses API)
 """
 import json
+import traceback
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from ..services.responses_api.orchestrator import ResponsesOrchestrator
 from ..services.responses_api.tools_registry import ResponsesToolsRegistry
+from ..services.responses_api.config import ResponsesAPIConfig
 from ..services.logger_service import logger
-from ..services.llm_request_logger import llm_request_logger
+from ..services.llm_request_logger import llm_request_logger, LOGGING_ENABLED
 from ..services.tool_history_service import get_tool_history_service
 
 
 class BaseAgent:
     """Базовый класс для всех агентов (использует Responses API)"""
     
+    # Значения по умолчанию: граф читает эти атрибуты у любого агента без hasattr.
+    # Списки не изменяются на месте - при каждом вызове присваиваются заново
+    _last_tool_calls: List[Dict[str, Any]] = []
+    _used_tool_names: tuple = ()
+    _call_manager_result: Optional[Dict[str, Any]] = None
+    
     def __init__(
         self,
         langgraph_service,
@@ -35,9 +43,10 @@ class BaseAgent:
         tools_registry = ResponsesToolsRegistry()
         if tools:
             tools_registry.register_tools_from_list(tools)
+            # Схемы инструментов для LLM лога строятся при создании агента, а не в первом запросе
+            llm_request_logger.prepare_tools(tools)
         
         # Используем конфигурацию из langgraph_service для избежания дублирования
-        from ..services.responses_api.config import ResponsesAPIConfig
         config = langgraph_service.config if hasattr(langgraph_service, 'config') else ResponsesAPIConfig()
         
         # Создаём orchestrator с общей конфигурацией
@@ -50,6 +59,9 @@ class BaseAgent:
         # Инициализируем список для отслеживания tool_calls
         self._last_tool_calls = []
         
+        # Имена вызванных инструментов (вычисляются один раз при сохранении tool_calls)
+        self._used_tool_names = ()
+        
         # Результат CallManager (если был вызван)
         self._call_manager_result = None
         
@@ -65,18 +77,20 @@ class BaseAgent:
         try:
             # Очищаем предыдущие tool_calls
             self._last_tool_calls = []
+            self._used_tool_names = ()
             self._call_manager_result = None
             
-            # Логируем сообщение пользователя
-            llm_request_logger.start_new_request()
-            timestamp = datetime.now().isoformat()
-            log_entry = f"\n{'='*80}\n"
-            log_entry += f"[{timestamp}] USER MESSAGE (EXACT DATA SENT TO API)\n"
-            log_entry += f"{'='*80}\n"
-            log_entry += f"Agent: {self.agent_name}\n"
-            log_entry += f"Message:\n{message}\n"
-            log_entry += f"Previous Response ID: {previous_response_id or 'None (новый диалог)'}\n"
-            llm_request_logger._write_raw(log_entry)
+            # Логируем сообщение пользователя (запись лога не собирается, если логирование выключено)
+            if LOGGING_ENABLED:
+                llm_request_logger.start_new_request()
+                timestamp = datetime.now().isoformat()
+                log_entry = f"\n{'='*80}\n"
+                log_entry += f"[{timestamp}] USER MESSAGE (EXACT DATA SENT TO API)\n"
+                log_entry += f"{'='*80}\n"
+                log_entry += f"Agent: {self.agent_name}\n"
+                log_entry += f"Message:\n{message}\n"
+                log_entry += f"Previous Response ID: {previous_response_id or 'None (новый диалог)'}\n"
+                llm_request_logger._write_raw(log_entry)
             
             # Логируем запрос к LLM
             llm_request_logger.log_request_to_llm(
@@ -94,6 +108,7 @@ class BaseAgent:
             # Сохраняем tool_calls
             if result.get("tool_calls"):
                 self._last_tool_calls = result["tool_calls"]
+                self._used_tool_names = tuple(tool["name"] for tool in self._last_tool_calls)
             
             # Проверяем CallManager
             if result.get("call_manager"):
@@ -118,7 +133,6 @@ class BaseAgent:
             return reply, response_id
         
         except Exception as e:
-            import traceback
             error_traceback = traceback.format_exc()
             
             # Логируем ошибку в LLM лог
@@ -4,7 +4,7 @@
 import json
 import re
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from .base_agent import BaseAgent
 from .dialogue_stages import DialogueStage
 from ..services.langgraph_service import LangGraphService
@@ -14,6 +14,8 @@ from .tools.call_manager_tools import CallManager
 
 class StageDetection(BaseModel):
     """Структура для определения стадии"""
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     stage: str = Field(
         description="Стадия диалога из DialogueStage enum"
     )
@@ -61,7 +63,7 @@ class StageDetectorAgent(BaseAgent):
         if detection.stage not in [stage.value for stage in DialogueStage]:
             logger.warning(f"Неизвестная стадия: {detection.stage}, устанавливаю morning")
             logger.warning(f"Доступные стадии: {[stage.value for stage in DialogueStage]}")
-            detection.stage = DialogueStage.MORNING.value
+            detection = StageDetection(stage=DialogueStage.MORNING.value)
         
         return detection
     
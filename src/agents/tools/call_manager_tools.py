@@ -2,9 +2,11 @@
 Инструмент для передачи диалога менеджеру
 """
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from yandex_cloud_ml_sdk._threads.thread import Thread
 
+from ...services.escalation_service import EscalationService
+
 try:
     from ..services.logger_service import logger
 except ImportError:
@@ -32,6 +34,9 @@ class CallManager(BaseModel):
     После вызова этого инструмента твоя работа завершается - не давай никакого ответа клиенту.
     """
     
+    # Аргументы инструмента только читаются; лишние ключи (_chat_id и т.п.) игнорируются
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     reason: str = Field(
         description="Краткое описание причины вызова менеджера. Например: 'Клиент жалуется на качество услуги', 'Клиент задал вопрос на который я не знаю ответа', 'Произошла ошибка при использовании инструмента GetServices'"
     )
@@ -47,8 +52,6 @@ class CallManager(BaseModel):
             Строка с маркером [CALL_MANAGER] для обработки в BaseAgent
         """
         try:
-            from ...services.escalation_service import EscalationService
-            
             # Извлекаем последние сообщения из Thread
             messages = self._extract_last_messages(thread, count=3)
             
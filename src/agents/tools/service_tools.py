@@ -2,7 +2,7 @@
 Инструменты для работы с каталогом услуг
 """
 import json
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from yandex_cloud_ml_sdk._threads.thread import Thread
 
 # Импорты
@@ -24,6 +24,9 @@ class GetServices(BaseModel):
     Используй когда клиент спрашивает "какие виды маникюра?" или "что есть в категории массаж?"
     """
     
+    # Аргументы инструмента только читаются; лишние ключи (_chat_id и т.п.) игнорируются
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     category_id: str = Field(
         description="ID категории (строка). Доступные категории: '1' - Маникюр, '2' - Педикюр, '3' - Услуги для мужчин, '4' - Брови, '5' - Ресницы, '6' - Макияж, '7' - Парикмахерские услуги, '8' - Пирсинг, '9' - Лазерная эпиляция, '10' - Косметология, '11' - Депиляция, '12' - Массаж, '13' - LOOKTOWN SPA."
     )
@@ -62,17 +65,15 @@ class GetServices(BaseModel):
             # Форматируем услуги
             result_lines = [f"Услуги категории '{category_name}':\n"]
             
+            append = result_lines.append
             for service in services:
-                name = service.get('name', 'Неизвестно')
-                price = service.get('prices', 'Не указана')
-                master_level = service.get('master_level')
-                service_id = service.get('id', 'Не указан')
-                
-                service_line = f"  • {name} (ID: {service_id}) - {price} руб."
-                if master_level:
-                    service_line += f" ({master_level})"
-                
-                result_lines.append(service_line)
+                get = service.get
+                master_level = get('master_level')
+                level_suffix = f" ({master_level})" if master_level else ""
+                append(
+                    f"  • {get('name', 'Неизвестно')} (ID: {get('id', 'Не указан')}) - "
+                    f"{get('prices', 'Не указана')} руб.{level_suffix}"
+                )
             
             return "\n".join(result_lines)
             
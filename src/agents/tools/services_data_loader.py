@@ -4,25 +4,42 @@
 """
 import os
 import json
+import time
 from pathlib import Path
+from threading import Lock
 from typing import Dict, Optional
-from functools import lru_cache
+from urllib.parse import quote
+
+import requests
+
+# Корень проекта (файл services.json по умолчанию лежит там)
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
 
 
 class ServicesDataLoader:
     """Загрузчик данных об услугах с поддержкой разных источников"""
     
+    STORAGE_ENDPOINT = 'https://storage.yandexcloud.net'
+    
     def __init__(self):
         """Инициализация загрузчика"""
         self.data_source = os.getenv('SERVICES_DATA_SOURCE', 'file')  # 'file' или 'storage'
         self.file_path = os.getenv('SERVICES_FILE_PATH', 'services.json')
         self.storage_bucket = os.getenv('YC_BUCKET_NAME')
         self.storage_path = os.getenv('SERVICES_STORAGE_PATH', 'services.json')
+        # Публичный бакет читается одним GET без boto3 (только по явному YC_BUCKET_PUBLIC=true)
+        self.storage_public = os.getenv('YC_BUCKET_PUBLIC', 'false').lower() == 'true'
+        
+        # Кэш данных: каталог услуг меняется редко, а запрашивается на каждом ходе диалога
+        self.cache_ttl = int(os.getenv('SERVICES_CACHE_TTL', '300'))
+        self._cache: Optional[Dict] = None
+        self._cache_timestamp = 0.0
+        self._cache_lock = Lock()
+        self._s3_client = None
     
-    @lru_cache(maxsize=1)
     def load_data(self) -> Dict:
         """
-        Загрузка данных об услугах
+        Загрузка данных об услугах (с кэшированием на cache_ttl секунд)
         
         Returns:
             Словарь с данными об услугах
@@ -31,15 +48,26 @@ class ServicesDataLoader:
             FileNotFoundError: если файл не найден
             json.JSONDecodeError: если ошибка парсинга JSON
         """
-        if self.data_source == 'storage':
-            return self._load_from_storage()
-        else:
-            return self._load_from_file()
+        if self._cache is not None and (time.time() - self._cache_timestamp) < self.cache_ttl:
+            return self._cache
+        
+        # Блокировка, чтобы параллельные запросы не загружали данные одновременно
+        with self._cache_lock:
+            if self._cache is not None and (time.time() - self._cache_timestamp) < self.cache_ttl:
+                return self._cache
+            
+            if self.data_source == 'storage':
+                data = self._load_from_storage()
+            else:
+                data = self._load_from_file()
+            
+            self._cache = data
+            self._cache_timestamp = time.time()
+            return data
     
     def _load_from_file(self) -> Dict:
         """Загрузка из файла проекта"""
-        project_root = Path(__file__).parent.parent.parent.parent
-        file_path = project_root / self.file_path
+        file_path = _PROJECT_ROOT / self.file_path
         
         if not file_path.exists():
             raise FileNotFoundError(f"Файл {file_path} не найден")
@@ -49,30 +77,43 @@ class ServicesDataLoader:
     
     def _load_from_storage(self) -> Dict:
         """Загрузка из Object Storage"""
-        try:
-            import boto3
-        except ImportError:
-            raise ImportError("Для работы с Object Storage установите boto3: pip install boto3")
-        
-        session = boto3.Session(
-            aws_access_key_id=os.getenv('YC_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('YC_SECRET_ACCESS_KEY')
-        )
-        s3 = session.client(
-            service_name='s3',
-            endpoint_url='https://storage.yandexcloud.net'
-        )
-        
         if not self.storage_bucket:
             raise ValueError("Не задан YC_BUCKET_NAME для работы с хранилищем")
         
-        response = s3.get_object(Bucket=self.storage_bucket, Key=self.storage_path)
+        # Публичный бакет - анонимный GET; иначе boto3 со стандартной цепочкой учётных данных
+        if self.storage_public:
+            url = f"{self.STORAGE_ENDPOINT}/{quote(self.storage_bucket)}/{quote(self.storage_path)}"
+            response = requests.get(url, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        
+        response = self._get_s3_client().get_object(Bucket=self.storage_bucket, Key=self.storage_path)
         content = response['Body'].read().decode('utf-8')
         return json.loads(content)
     
+    def _get_s3_client(self):
+        """Получить S3 клиент (создаётся один раз на процесс)"""
+        if self._s3_client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ImportError("Для работы с Object Storage установите boto3: pip install boto3")
+            
+            session = boto3.Session(
+                aws_access_key_id=os.getenv('YC_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.getenv('YC_SECRET_ACCESS_KEY')
+            )
+            self._s3_client = session.client(
+                service_name='s3',
+                endpoint_url=self.STORAGE_ENDPOINT
+            )
+        return self._s3_client
+    
     def reload(self):
         """Принудительная перезагрузка данных (очистка кэша)"""
-        self.load_data.cache_clear()
+        with self._cache_lock:
+            self._cache = None
+            self._cache_timestamp = 0.0
 
 
 # Глобальный экземпляр загрузчика
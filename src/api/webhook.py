@@ -1,15 +1,64 @@
 """
 Обработчик веб-хуков
 """
+import asyncio
+import os
+from typing import Set
+
+import orjson
 from fastapi import Request
 from telegram import Update
 
 from src.services.logger_service import logger
 from src.telegram_app import get_application, process_telegram_update
 
+# Фоновая обработка update: webhook сразу отвечает Telegram, а обработка идёт в задаче.
+# По умолчанию выключена - в Serverless Containers после ответа контейнер может быть
+# заморожен, поэтому там обработку нужно дожидаться.
+BACKGROUND_PROCESSING = os.getenv('WEBHOOK_BACKGROUND_PROCESSING', 'false').lower() == 'true'
+
+# Ограничение размера тела для корневого POST (update от Telegram заметно меньше)
+MAX_ROOT_POST_BODY_SIZE = 1_048_576
+
+# Ответ корневого POST для запросов, не являющихся Telegram update
+_ROOT_RESPONSE = {
+    "status": "OK",
+    "message": "Looktown Bot is running",
+    "version": "0.1.0"
+}
+
+# Храним ссылки на фоновые задачи, чтобы их не собрал GC до завершения
+_pending_tasks: Set[asyncio.Task] = set()
+
+
+async def _process_update_in_background(update: Update):
+    """Обработка update в фоновой задаче с логированием ошибок"""
+    try:
+        await process_telegram_update(update)
+    except Exception as e:
+        logger.error("Ошибка при фоновой обработке update: %s", str(e), exc_info=True)
+
+
+async def _dispatch_update(update: Update):
+    """Обработать update сразу или запланировать фоновую задачу"""
+    if not BACKGROUND_PROCESSING:
+        await process_telegram_update(update)
+        return
+    
+    task = asyncio.create_task(_process_update_in_background(update))
+    _pending_tasks.add(task)
+    task.add_done_callback(_pending_tasks.discard)
+
+
+async def wait_pending_updates():
+    """Дождаться завершения фоновых задач обработки (при остановке приложения)"""
+    if _pending_tasks:
+        logger.info("Ожидание завершения фоновых задач: %s", len(_pending_tasks))
+        await asyncio.gather(*_pending_tasks, return_exceptions=True)
+
 
 async def webhook(request: Request):
-    """Обработчик webhook от Telegram - ожидает завершения обработки"""
+    """Обработчик webhook от Telegram"""
     application = get_application()
     
     try:
@@ -17,14 +66,13 @@ async def webhook(request: Request):
             logger.error("Приложение Telegram не инициализировано")
             return {"ok": False, "error": "Application not initialized"}
         
-        data = await request.json()
+        data = orjson.loads(await request.body())
         update = Update.de_json(data, application.bot)
         
-        # ОЖИДАЕМ завершения обработки (как в рабочем проекте)
+        # Без фонового режима ОЖИДАЕМ завершения обработки (как в рабочем проекте)
         # Event loop не блокируется, т.к. операции внутри асинхронные
-        await process_telegram_update(update)
+        await _dispatch_update(update)
         
-        # Возвращаем ответ только после полной обработки
         return {"ok": True}
     except Exception as e:
         logger.error("Ошибка при обработке webhook: %s", str(e))
@@ -35,34 +83,33 @@ async def root_post(request: Request):
     """
     POST обработчик для корневого пути.
     Может обрабатывать как обычные запросы, так и Telegram webhook.
-    Ожидает завершения обработки для Telegram updates.
+    Без фонового режима ожидает завершения обработки для Telegram updates.
     """
     try:
+        body = await request.body()
+        
+        # Быстрый путь: слишком большие тела и тела без ключей Telegram update не парсим
+        if len(body) > MAX_ROOT_POST_BODY_SIZE:
+            return dict(_ROOT_RESPONSE)
+        if b'"message"' not in body and b'"callback_query"' not in body:
+            return dict(_ROOT_RESPONSE)
+        
         # Пытаемся обработать как Telegram webhook
-        data = await request.json()
+        data = orjson.loads(body)
         
         # Проверяем, что это Telegram update
-        if "message" in data or "callback_query" in data:
+        if isinstance(data, dict) and ("message" in data or "callback_query" in data):
             application = get_application()
             if not application:
                 return {"status": "OK", "error": "Application not initialized"}
             
             update = Update.de_json(data, application.bot)
-            # ОЖИДАЕМ завершения обработки (как в рабочем проекте)
-            await process_telegram_update(update)
+            await _dispatch_update(update)
             return {"status": "ok"}
         else:
             # Если это не Telegram update, возвращаем обычный ответ
-            return {
-                "status": "OK",
-                "message": "Looktown Bot is running",
-                "version": "0.1.0"
-            }
+            return dict(_ROOT_RESPONSE)
     except Exception as e:
         logger.error(f"❌ Ошибка обработки POST запроса: {e}")
         # В случае ошибки возвращаем обычный ответ
-        return {
-            "status": "OK",
-            "message": "Looktown Bot is running",
-            "version": "0.1.0"
-        }
+        return dict(_ROOT_RESPONSE)
@@ -2,14 +2,19 @@
 
 import logging
 import os
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_telegram_admin_group_id() -> int | None:
     """
     Получает ID группы Telegram для админ-панели.
     
+    Переменная окружения не меняется в рамках процесса, поэтому значение
+    читается один раз и кэшируется.
+    
     Returns:
         ID группы или None, если не установлен
     """
@@ -38,3 +43,22 @@ def get_admin_topics_table() -> str:
     return os.getenv("ADMIN_TOPICS_TABLE", "adminpanel")
 
 
+def get_admin_mode_cache_ttl() -> float:
+    """
+    Получает время жизни кэша режима работы пользователя (в секундах).
+    
+    Режим может переключить другой экземпляр контейнера, поэтому кэш
+    режима короткий; 0 отключает кэширование режима.
+    
+    Returns:
+        TTL в секундах (по умолчанию 5)
+    """
+    ttl_str = os.getenv("ADMIN_MODE_CACHE_TTL", "5")
+    try:
+        return max(float(ttl_str), 0.0)
+    except ValueError:
+        logger.error(
+            "ADMIN_MODE_CACHE_TTL должен быть числом, получено: %s",
+            ttl_str
+        )
+        return 5.0
@@ -1,7 +1,9 @@
 """
 Основной граф состояний для обработки всех стадий диалога (Responses API)
 """
-from typing import Literal
+import asyncio
+from functools import partial
+from typing import Optional
 from langgraph.graph import StateGraph, START, END
 from .conversation_state import ConversationState
 from ..agents.stage_detector_agent import StageDetectorAgent
@@ -12,40 +14,61 @@ from ..services.langgraph_service import LangGraphService
 from ..services.logger_service import logger
 
 
+# Реестр стадий графа: стадия -> (класс агента, имя агента в состоянии графа)
+# Для каждой стадии создаётся узел handle_<стадия> (общий обработчик _handle_agent),
+# маршрут из detect_stage и ребро к END
+STAGE_REGISTRY = {
+    "morning": (MorningAgent, "MorningAgent"),
+    "evening": (EveningAgent, "EveningAgent"),
+}
+
+# Стадия по умолчанию (если стадия не определена или неизвестна)
+DEFAULT_STAGE = "morning"
+
+# Допустимые стадии для маршрутизации (выводятся из реестра один раз)
+VALID_STAGES = frozenset(STAGE_REGISTRY)
+
+
 class MainGraph:
     """Основной граф состояний для обработки всех стадий диалога"""
     
     # Кэш для агентов (чтобы не создавать их заново при каждом создании графа)
     _agents_cache = {}
     
+    # Кэш собранных и скомпилированных графов (с тем же ключом, что и агенты)
+    _compiled_cache = {}
+    
     @classmethod
     def clear_cache(cls):
-        """Очистить кэш агентов"""
+        """Очистить кэш агентов и скомпилированных графов"""
         cls._agents_cache.clear()
+        cls._compiled_cache.clear()
     
     def __init__(self, langgraph_service: LangGraphService):
         self.langgraph_service = langgraph_service
         
-        # Используем кэш для агентов
-        cache_key = id(langgraph_service)
+        # Используем кэш для агентов (ключ по конфигурации, а не по id объекта:
+        # id может быть переиспользован после сборки мусора)
+        cache_key = langgraph_service.cache_key()
         
         if cache_key not in MainGraph._agents_cache:
             # Создаём агентов только если их ещё нет в кэше
-            MainGraph._agents_cache[cache_key] = {
-                'stage_detector': StageDetectorAgent(langgraph_service),
-                'morning': MorningAgent(langgraph_service),
-                'evening': EveningAgent(langgraph_service),
-            }
+            agents = {'stage_detector': StageDetectorAgent(langgraph_service)}
+            for stage, (agent_class, _) in STAGE_REGISTRY.items():
+                agents[stage] = agent_class(langgraph_service)
+            MainGraph._agents_cache[cache_key] = agents
         
         # Используем агентов из кэша
         agents = MainGraph._agents_cache[cache_key]
         self.stage_detector = agents['stage_detector']
-        self.morning_agent = agents['morning']
-        self.evening_agent = agents['evening']
+        self.agents = {stage: agents[stage] for stage in STAGE_REGISTRY}
+        
+        # Создаём и компилируем граф только один раз для данного сервиса
+        if cache_key not in MainGraph._compiled_cache:
+            graph = self._create_graph()
+            MainGraph._compiled_cache[cache_key] = (graph, graph.compile())
         
-        # Создаём граф
-        self.graph = self._create_graph()
-        self.compiled_graph = self.graph.compile()
+        self.graph, self.compiled_graph = MainGraph._compiled_cache[cache_key]
     
     def _create_graph(self) -> StateGraph:
         """Создание графа состояний"""
@@ -53,26 +76,25 @@ class MainGraph:
         
         # Добавляем узлы
         graph.add_node("detect_stage", self._detect_stage)
-        graph.add_node("handle_morning", self._handle_morning)
-        graph.add_node("handle_evening", self._handle_evening)
+        for stage in STAGE_REGISTRY:
+            graph.add_node(f"handle_{stage}", partial(self._handle_agent, stage=stage))
         
         # Добавляем рёбра
+        routes = {stage: f"handle_{stage}" for stage in STAGE_REGISTRY}
+        routes["end"] = END
+        
         graph.add_edge(START, "detect_stage")
         graph.add_conditional_edges(
             "detect_stage",
             self._route_after_detect,
-            {
-                "morning": "handle_morning",
-                "evening": "handle_evening",
-                "end": END
-            }
+            routes
         )
-        graph.add_edge("handle_morning", END)
-        graph.add_edge("handle_evening", END)
+        for stage in STAGE_REGISTRY:
+            graph.add_edge(f"handle_{stage}", END)
         return graph
     
-    def _detect_stage(self, state: ConversationState) -> ConversationState:
-        """Узел определения стадии"""
+    async def _detect_stage(self, state: ConversationState) -> ConversationState:
+        """Узел определения стадии (запрос к LLM выполняется в отдельном потоке, не блокируя event loop)"""
         logger.info("Определение стадии диалога")
         
         message = state["message"]
@@ -80,12 +102,14 @@ class MainGraph:
         chat_id = state.get("chat_id")
         
         # Определяем стадию
-        stage_detection = self.stage_detector.detect_stage(message, previous_response_id, chat_id=chat_id)
+        stage_detection = await asyncio.to_thread(
+            self.stage_detector.detect_stage, message, previous_response_id, chat_id=chat_id
+        )
         
         # Проверяем, был ли вызван CallManager в StageDetectorAgent
-        if hasattr(self.stage_detector, '_call_manager_result') and self.stage_detector._call_manager_result:
+        if self.stage_detector._call_manager_result:
             escalation_result = self.stage_detector._call_manager_result
-            logger.info(f"CallManager был вызван в StageDetectorAgent, chat_id: {chat_id}")
+            logger.info("CallManager был вызван в StageDetectorAgent, chat_id: %s", chat_id)
             
             return {
                 "answer": escalation_result.get("user_message"),
@@ -99,9 +123,7 @@ class MainGraph:
             "stage": stage_detection.stage
         }
     
-    def _route_after_detect(self, state: ConversationState) -> Literal[
-        "morning", "evening", "end"
-    ]:
+    def _route_after_detect(self, state: ConversationState) -> str:
         """Маршрутизация после определения стадии"""
         # Если CallManager был вызван, завершаем граф
         if state.get("answer") and state.get("manager_alert"):
@@ -109,86 +131,71 @@ class MainGraph:
             return "end"
         
         # Иначе маршрутизируем по стадии
-        stage = state.get("stage", "morning")
-        logger.info(f"Маршрутизация на стадию: {stage}")
+        stage = state.get("stage", DEFAULT_STAGE)
+        logger.info("Маршрутизация на стадию: %s", stage)
         
         # Валидация стадии
-        valid_stages = [
-            "morning", "evening"
-        ]
-        
-        if stage not in valid_stages:
-            logger.warning(f"⚠️ Неизвестная стадия: {stage}, устанавливаю morning")
-            return "morning"
+        if stage not in VALID_STAGES:
+            logger.warning("⚠️ Неизвестная стадия: %s, устанавливаю %s", stage, DEFAULT_STAGE)
+            return DEFAULT_STAGE
         
         return stage
     
-    def _process_agent_result(self, agent, answer: str, state: ConversationState, agent_name: str) -> ConversationState:
+    def _process_agent_result(self, agent, answer: tuple[str, Optional[str]], state: ConversationState, agent_name: str) -> ConversationState:
         """
         Обработка результата агента с проверкой на CallManager
         
         Args:
             agent: Экземпляр агента
-            answer: Ответ агента
+            answer: Кортеж (ответ агента, response_id) - контракт BaseAgent.__call__
             state: Текущее состояние графа
             agent_name: Имя агента
             
         Returns:
             Обновленное состояние графа
         """
-        used_tools = [tool["name"] for tool in agent._last_tool_calls] if hasattr(agent, '_last_tool_calls') and agent._last_tool_calls else []
-        
-        # Агент всегда возвращает кортеж (answer, response_id)
-        # Извлекаем ответ и response_id
-        if isinstance(answer, tuple) and len(answer) == 2:
-            answer_text, response_id = answer
-        else:
-            # Если по какой-то причине не кортеж, response_id остается None
-            answer_text = answer
-            response_id = None
+        # Агент всегда возвращает кортеж (answer, response_id) - распаковываем без проверок
+        answer_text, response_id = answer
         
         # Проверяем, был ли вызван CallManager через инструмент
-        if answer_text == "[CALL_MANAGER_RESULT]" and hasattr(agent, '_call_manager_result') and agent._call_manager_result:
+        if answer_text == "[CALL_MANAGER_RESULT]" and agent._call_manager_result:
             escalation_result = agent._call_manager_result
             chat_id = state.get("chat_id", "unknown")
             
-            logger.info(f"CallManager был вызван через инструмент в агенте {agent_name}, chat_id: {chat_id}")
+            logger.info("CallManager был вызван через инструмент в агенте %s, chat_id: %s", agent_name, chat_id)
             
+            # Узел ведёт в END, used_tools после эскалации никто не читает - ключ не заполняем
             return {
                 "answer": escalation_result.get("user_message"),
                 "manager_alert": escalation_result.get("manager_alert"),
                 "agent_name": agent_name,
-                "used_tools": used_tools,
                 "response_id": response_id
             }
         
         # Обычный ответ агента
-        answer = answer_text
-        
         return {
-            "answer": answer,
+            "answer": answer_text,
             "agent_name": agent_name,
-            "used_tools": used_tools,
+            "used_tools": list(agent._used_tool_names),
             "response_id": response_id
         }
     
-    def _handle_morning(self, state: ConversationState) -> ConversationState:
-        """Обработка утреннего приветствия"""
-        logger.info("Обработка утреннего приветствия")
-        message = state["message"]
-        previous_response_id = state.get("previous_response_id")
-        chat_id = state.get("chat_id")
+    async def _handle_agent(self, state: ConversationState, stage: str) -> ConversationState:
+        """
+        Обработка сообщения агентом стадии (запрос к LLM выполняется в отдельном потоке)
         
-        agent_result = self.morning_agent(message, previous_response_id, chat_id=chat_id)
-        return self._process_agent_result(self.morning_agent, agent_result, state, "MorningAgent")
-    
-    def _handle_evening(self, state: ConversationState) -> ConversationState:
-        """Обработка вечернего приветствия"""
-        logger.info("Обработка вечернего приветствия")
+        Args:
+            state: Текущее состояние графа
+            stage: Стадия из STAGE_REGISTRY
+            
+        Returns:
+            Обновленное состояние графа
+        """
+        logger.info("Обработка стадии: %s", stage)
         message = state["message"]
         previous_response_id = state.get("previous_response_id")
         chat_id = state.get("chat_id")
         
-        agent_result = self.evening_agent(message, previous_response_id, chat_id=chat_id)
-        return self._process_agent_result(self.evening_agent, agent_result, state, "EveningAgent")
-
+        agent = self.agents[stage]
+        agent_result = await asyncio.to_thread(agent, message, previous_response_id, chat_id=chat_id)
+        return self._process_agent_result(agent, agent_result, state, STAGE_REGISTRY[stage][1])
@@ -3,51 +3,34 @@
 """
 from telegram import Update
 from telegram.ext import ContextTypes
+from telegram.error import TelegramError
 
 from src.config.admin_config import get_telegram_admin_group_id
 from src.services.logger_service import logger
-from src.storage import get_topic_storage
-from src.services.admin_service import AdminPanelService
-
-# Глобальная переменная для админ-панели
-_admin_service = None
-
-
-def _get_admin_service(bot):
-    """Получает или создает экземпляр AdminPanelService."""
-    global _admin_service
-    if _admin_service is None:
-        admin_group_id = get_telegram_admin_group_id()
-        if admin_group_id is None:
-            logger.debug("Админ-панель не настроена (TELEGRAM_ADMIN_GROUP_ID не установлен)")
-            return None
-
-        try:
-            storage = get_topic_storage()
-            _admin_service = AdminPanelService(
-                bot=bot,
-                storage=storage,
-                admin_group_id=admin_group_id,
-            )
-            logger.debug("Инициализирован AdminPanelService")
-        except Exception as e:
-            logger.warning("Не удалось инициализировать AdminPanelService: %s", str(e))
-            return None
+from src.services.admin_service_factory import get_admin_service
+
 
-    return _admin_service
+def _is_admin_group_update(update: Update) -> bool:
+    """Проверяет, что обновление пришло из админской группы (ID группы кэширован)."""
+    admin_group_id = get_telegram_admin_group_id()
+    if admin_group_id is None or update.effective_chat is None:
+        return False
+    return update.effective_chat.id == admin_group_id
 
 
 async def handle_admin_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обрабатывает сообщения от админов в админской группе."""
-    if not update.message:
+    # Сначала дешёвая проверка чата: обновления из других чатов не трогают админ-сервис
+    if not _is_admin_group_update(update) or not update.message:
         return
 
     message = update.message
-    chat_id = update.effective_chat.id
-    admin_group_id = get_telegram_admin_group_id()
 
-    if admin_group_id is None or chat_id != admin_group_id:
+    admin_service = get_admin_service(context.bot)
+    if admin_service is None:
         return
+    admin_group_id = admin_service.admin_group_id
+
     if message.message_thread_id is None:
         return
     if message.from_user and message.from_user.is_bot:
@@ -58,11 +41,6 @@ async def handle_admin_message(update: Update, context: ContextTypes.DEFAULT_TYP
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
-        if admin_service is None:
-            logger.warning("AdminPanelService не инициализирован. Сообщение не будет обработано.")
-            return
-
         user_id = admin_service.storage.get_user_id(topic_id)
         if user_id is None:
             logger.warning("Не найден user_id для topic_id=%s. Сообщение не будет переслано.", topic_id)
@@ -84,60 +62,57 @@ async def handle_admin_message(update: Update, context: ContextTypes.DEFAULT_TYP
                 from_chat_id=admin_group_id,
                 message_id=message.message_id,
             )
+    except TelegramError as e:
+        # Ошибка Telegram API ожидаема (сообщение удалено, клиент заблокировал бота) - без traceback
+        logger.warning("Ошибка Telegram при пересылке сообщения от админа: %s", e)
     except Exception as e:
-        logger.error("Ошибка при пересылке сообщения от админа: %s", str(e), exc_info=True)
+        logger.error("Ошибка при пересылке сообщения от админа: %s", e, exc_info=True)
 
 
 async def handle_manager_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обрабатывает команду /manager для включения ручного режима."""
-    if not update.message:
+    # Сначала дешёвая проверка чата: обновления из других чатов не трогают админ-сервис
+    if not _is_admin_group_update(update) or not update.message:
         return
 
     message = update.message
-    chat_id = update.effective_chat.id
-    admin_group_id = get_telegram_admin_group_id()
 
-    if admin_group_id is None or chat_id != admin_group_id:
+    admin_service = get_admin_service(context.bot)
+    if admin_service is None:
         return
+
     if message.message_thread_id is None:
         return
 
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
-        if admin_service is None:
-            logger.warning("AdminPanelService не инициализирован. Команда /manager не выполнена.")
-            return
-
         await admin_service.enable_manual_mode(topic_id)
     except Exception as e:
-        logger.error("Ошибка при выполнении команды /manager: %s", str(e), exc_info=True)
+        # Traceback уже записан в AdminPanelService перед повторным выбросом исключения
+        logger.error("Ошибка при выполнении команды /manager: %s", e)
 
 
 async def handle_bot_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Обрабатывает команду /bot для включения автоматического режима."""
-    if not update.message:
+    # Сначала дешёвая проверка чата: обновления из других чатов не трогают админ-сервис
+    if not _is_admin_group_update(update) or not update.message:
         return
 
     message = update.message
-    chat_id = update.effective_chat.id
-    admin_group_id = get_telegram_admin_group_id()
 
-    if admin_group_id is None or chat_id != admin_group_id:
+    admin_service = get_admin_service(context.bot)
+    if admin_service is None:
         return
+
     if message.message_thread_id is None:
         return
 
     topic_id = message.message_thread_id
 
     try:
-        admin_service = _get_admin_service(context.bot)
-        if admin_service is None:
-            logger.warning("AdminPanelService не инициализирован. Команда /bot не выполнена.")
-            return
-
         await admin_service.enable_auto_mode(topic_id)
     except Exception as e:
-        logger.error("Ошибка при выполнении команды /bot: %s", str(e), exc_info=True)
+        # Traceback уже записан в AdminPanelService перед повторным выбросом исключения
+        logger.error("Ошибка при выполнении команды /bot: %s", e)
 
@@ -1,49 +1,94 @@
 """
 Обработчики Telegram сообщений
 """
+import asyncio
+
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from telegram.error import BadRequest, TelegramError
 
-from service_factory import get_yandex_agent_service
+from service_factory import get_yandex_agent_service, get_escalation_service
 from src.services.logger_service import logger
-from src.services.date_normalizer import normalize_dates_in_text
-from src.services.time_normalizer import normalize_times_in_text
-from src.services.link_converter import convert_yclients_links_in_text
-from src.services.text_formatter import convert_bold_markdown_to_html
+from src.services.reply_formatter import format_reply_text
 from src.services.retry_service import RetryService
 from src.services.call_manager_service import CallManagerException
-from src.services.escalation_service import EscalationService
-from src.config.admin_config import get_telegram_admin_group_id
-from src.storage import get_topic_storage
-from src.services.admin_service import AdminPanelService
+from src.services.admin_service_factory import get_admin_service
+
+# Начиная с этой длины форматирование ответа выполняется в отдельном потоке,
+# чтобы regex-проход по длинному тексту не блокировал event loop.
+# Для коротких ответов запуск потока дороже самого форматирования
+REPLY_FORMAT_THREAD_THRESHOLD = 2048
+
+
+async def _format_reply(text: str) -> str:
+    """Форматирование ответа (длинные тексты - в отдельном потоке)"""
+    if not text or len(text) < REPLY_FORMAT_THREAD_THRESHOLD:
+        return format_reply_text(text)
+    return await asyncio.to_thread(format_reply_text, text)
+
 
-# Глобальная переменная для админ-панели
-_admin_service = None
+async def _forward_user_message_to_admin(admin_service, update: Update):
+    """Пересылка сообщения пользователя в админ-панель (ошибки только логируются)"""
+    try:
+        await admin_service.forward_message_to_admin(
+            user=update.effective_user,
+            message=update.message,
+            source="User",
+        )
+    except TelegramError as e:
+        logger.warning("Не удалось отправить сообщение пользователя в админ-панель: %s", str(e))
 
 
-def get_admin_service(bot):
-    """Получает или создает экземпляр AdminPanelService."""
-    global _admin_service
-    if _admin_service is None:
-        admin_group_id = get_telegram_admin_group_id()
-        if admin_group_id is None:
-            logger.debug("Админ-панель не настроена (TELEGRAM_ADMIN_GROUP_ID не установлен)")
-            return None
+async def _send_typing_action(bot, chat_id: int):
+    """Отправка статуса «печатает» (ошибки только логируются)"""
+    try:
+        await bot.send_chat_action(chat_id=chat_id, action="typing")
+    except TelegramError as e:
+        logger.warning("Не удалось отправить статус набора текста: %s", str(e))
 
+
+async def _send_ai_response_to_admin(admin_service, user_id: int, ai_text: str):
+    """Отправка ответа AI в админ-панель (ошибки только логируются)"""
+    try:
+        await admin_service.send_ai_response_to_topic(
+            user_id=user_id,
+            ai_text=ai_text,
+        )
+    except TelegramError as e:
+        logger.warning("Не удалось отправить ответ AI в админ-панель: %s", str(e))
+
+
+async def _send_manager_alert(update: Update, admin_service, manager_alert: str):
+    """Отправка уведомления CallManager (в админ-панель или, если она недоступна, в чат)"""
+    # Отправляем уведомление в админ-панель (если настроено)
+    if admin_service and update.effective_user:
         try:
-            storage = get_topic_storage()
-            _admin_service = AdminPanelService(
-                bot=bot,
-                storage=storage,
-                admin_group_id=admin_group_id,
+            # Получаем историю сообщений для уведомления
+            # Пока используем упрощенную версию - только причину из manager_alert
+            reason = "Вызов менеджера через CallManager"
+            recent_messages = []  # Пока пустой список, можно расширить позже
+            
+            await admin_service.send_call_manager_notification(
+                user=update.effective_user,
+                reason=reason,
+                recent_messages=recent_messages,
             )
-            logger.debug("Инициализирован AdminPanelService")
         except Exception as e:
-            logger.warning("Не удалось инициализировать AdminPanelService: %s", str(e))
-            return None
-
-    return _admin_service
+            logger.warning("Не удалось отправить уведомление CallManager в админ-панель: %s", str(e))
+            # Fallback: отправляем через старый метод
+            try:
+                await update.message.reply_text(manager_alert, parse_mode=ParseMode.HTML)
+            except BadRequest as e2:
+                logger.warning("Ошибка при отправке manager_alert с HTML: %s, отправляю без форматирования", e2)
+                await update.message.reply_text(manager_alert, parse_mode=None)
+    else:
+        # Если админ-панель не настроена, используем старый метод
+        try:
+            await update.message.reply_text(manager_alert, parse_mode=ParseMode.HTML)
+        except BadRequest as e:
+            logger.warning("Ошибка при отправке manager_alert с HTML: %s, отправляю без форматирования", e)
+            await update.message.reply_text(manager_alert, parse_mode=None)
 
 
 async def send_to_agent(message_text, chat_id):
@@ -110,32 +155,30 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     admin_service = get_admin_service(context.bot)
     
     # Отправляем сообщение пользователя в админ-панель (если настроено)
+    # в фоне - пересылка не зависит от ответа агента
+    forward_task = None
     if admin_service and update.effective_user and update.message:
-        try:
-            await admin_service.forward_message_to_admin(
-                user=update.effective_user,
-                message=update.message,
-                source="User",
-            )
-        except Exception as e:
-            logger.warning("Не удалось отправить сообщение пользователя в админ-панель: %s", str(e))
+        forward_task = asyncio.create_task(_forward_user_message_to_admin(admin_service, update))
     
     # Проверяем режим работы: если ручной режим, прерываем выполнение
     if admin_service:
         if admin_service.is_user_in_manual_mode(user_id):
             logger.info("Пользователь user_id=%s в ручном режиме. ИИ пропускает обработку сообщения.", user_id)
+            if forward_task:
+                await forward_task
             return
     
-    await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
+    # Статус «печатает» отправляется параллельно с запросом к агенту
+    typing_task = asyncio.create_task(_send_typing_action(context.bot, update.effective_chat.id))
     
     agent_response = await send_to_agent(user_message, chat_id)
+    await typing_task
     # Ожидаем словарь: {"user_message": str, "manager_alert": Optional[str]}
     user_message_text = agent_response.get("user_message") if isinstance(agent_response, dict) else str(agent_response)
     
     # Проверяем на эскалацию [CALL_MANAGER] перед отправкой в Telegram
     if user_message_text and user_message_text.strip().startswith('[CALL_MANAGER]'):
-        escalation_service = EscalationService()
-        escalation_result = escalation_service.handle(user_message_text, chat_id)
+        escalation_result = get_escalation_service().handle(user_message_text, chat_id)
         user_message_text = escalation_result.get("user_message", user_message_text)
         # Обновляем agent_response с результатом эскалации
         agent_response = {
@@ -143,60 +186,29 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "manager_alert": escalation_result.get("manager_alert")
         }
     
-    # Нормализуем даты и время в ответе
-    user_message_text = normalize_dates_in_text(user_message_text)
-    user_message_text = normalize_times_in_text(user_message_text)
-    # Преобразуем ссылки yclients.com в HTML-гиперссылки
-    user_message_text = convert_yclients_links_in_text(user_message_text)
-    # Заменяем Markdown жирный текст (**текст**) на HTML теги (<b>текст</b>)
-    user_message_text = convert_bold_markdown_to_html(user_message_text)
+    # Нормализуем даты, время, ссылки yclients.com и жирный текст за один проход
+    user_message_text = await _format_reply(user_message_text)
+    manager_alert = None
+    if isinstance(agent_response, dict) and agent_response.get("manager_alert"):
+        manager_alert = await _format_reply(agent_response["manager_alert"])
+    
+    # Пересылка должна завершиться до ответа AI: она создаёт топик и задаёт порядок сообщений в нём
+    if forward_task:
+        await forward_task
+    
+    # Ответ пользователю отправляется первым: уведомление CallManager без админ-панели
+    # уходит в тот же чат и не должно его обогнать
     await update.message.reply_text(user_message_text, parse_mode=ParseMode.HTML)
-
-    # Отправляем ответ AI в админ-панель (если настроено)
+    
+    # Копия ответа в админ-панель (если настроено) и уведомление CallManager (если есть)
+    # отправляются параллельно; ошибки обрабатываются внутри каждой функции
+    admin_coros = []
     if admin_service:
-        try:
-            await admin_service.send_ai_response_to_topic(
-                user_id=user_id,
-                ai_text=user_message_text,
-            )
-        except Exception as e:
-            logger.warning("Не удалось отправить ответ AI в админ-панель: %s", str(e))
-
-    # Обработка уведомления CallManager
-    if isinstance(agent_response, dict) and agent_response.get("manager_alert"):
-        manager_alert = normalize_dates_in_text(agent_response["manager_alert"])
-        manager_alert = normalize_times_in_text(manager_alert)
-        manager_alert = convert_yclients_links_in_text(manager_alert)
-        manager_alert = convert_bold_markdown_to_html(manager_alert)
-        
-        # Отправляем уведомление в админ-панель (если настроено)
-        if admin_service and update.effective_user:
-            try:
-                # Получаем историю сообщений для уведомления
-                # Пока используем упрощенную версию - только причину из manager_alert
-                reason = "Вызов менеджера через CallManager"
-                recent_messages = []  # Пока пустой список, можно расширить позже
-                
-                await admin_service.send_call_manager_notification(
-                    user=update.effective_user,
-                    reason=reason,
-                    recent_messages=recent_messages,
-                )
-            except Exception as e:
-                logger.warning("Не удалось отправить уведомление CallManager в админ-панель: %s", str(e))
-                # Fallback: отправляем через старый метод
-                try:
-                    await update.message.reply_text(manager_alert, parse_mode=ParseMode.HTML)
-                except Exception as e2:
-                    logger.warning(f"Ошибка при отправке manager_alert с HTML: {e2}, отправляю без форматирования")
-                    await update.message.reply_text(manager_alert, parse_mode=None)
-        else:
-            # Если админ-панель не настроена, используем старый метод
-            try:
-                await update.message.reply_text(manager_alert, parse_mode=ParseMode.HTML)
-            except Exception as e:
-                logger.warning(f"Ошибка при отправке manager_alert с HTML: {e}, отправляю без форматирования")
-                await update.message.reply_text(manager_alert, parse_mode=None)
+        admin_coros.append(_send_ai_response_to_admin(admin_service, user_id, user_message_text))
+    if manager_alert:
+        admin_coros.append(_send_manager_alert(update, admin_service, manager_alert))
+    if admin_coros:
+        await asyncio.gather(*admin_coros)
     
     logger.telegram("Ответ отправлен", chat_id)
 
@@ -1,15 +1,38 @@
 """Сервис для работы с админ-панелью на базе Telegram Forum Topics."""
 
+import asyncio
 import logging
+import weakref
+from collections import OrderedDict
 from typing import Optional
 
+from langchain_core.messages import AIMessage, HumanMessage
 from telegram import Bot, Message, User
-from telegram.error import TelegramError
+from telegram.error import BadRequest, TelegramError
 
 from src.storage.topic_storage import BaseTopicStorage
 
 logger = logging.getLogger(__name__)
 
+# Максимальное количество пользователей в кэше отформатированных имён
+USER_FORMAT_CACHE_SIZE = 10_000
+
+# Заглушка для сообщений без текста и подписи (фото, стикеры и т.д.)
+_NO_TEXT = "(сообщение без текста)"
+
+NOT_FORUM_ERROR_TEMPLATE = (
+    "Группа с ID {admin_group_id} не является форумом. "
+    "Для работы админ-панели необходимо:\n"
+    "1. Преобразовать группу в супергруппу\n"
+    "2. Включить режим форума в настройках группы (Settings → Topics)\n"
+    "3. Убедиться, что бот является администратором группы"
+)
+
+TOPIC_CREATE_ERROR_TEMPLATE = (
+    "Ошибка при создании топика для user_id={user_id}: {error}. "
+    "Убедитесь, что бот является администратором группы и имеет права на создание топиков."
+)
+
 
 class AdminPanelService:
     """Сервис для управления админ-панелью через Forum Topics."""
@@ -32,6 +55,58 @@ class AdminPanelService:
         self.storage = storage
         self.admin_group_id = admin_group_id
 
+        # Группа подтверждена как форум: get_chat больше не выполняется.
+        # Отрицательный результат не кэшируется - режим форума могут включить без перезапуска бота
+        self._forum_verified = False
+        self._forum_lock = asyncio.Lock()
+
+        # Блокировки отправки по топикам: сообщения в один топик уходят по очереди
+        # (порядок и лимит Telegram на чат), в разные топики - параллельно.
+        # Блокировка удаляется из словаря, когда её больше никто не ждёт
+        self._topic_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+        # Кэш строк с именем пользователя: user_id -> ((full_name, username), название топика, блок с информацией)
+        self._user_fmt_cache: "OrderedDict[int, tuple[tuple, str, str]]" = OrderedDict()
+
+    def _topic_lock(self, topic_id: int) -> asyncio.Lock:
+        """Возвращает блокировку отправки для топика."""
+        lock = self._topic_locks.get(topic_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._topic_locks[topic_id] = lock
+        return lock
+
+    def _not_forum_error(self) -> RuntimeError:
+        """Формирует ошибку о том, что админская группа не является форумом."""
+        return RuntimeError(NOT_FORUM_ERROR_TEMPLATE.format(admin_group_id=self.admin_group_id))
+
+    async def _ensure_forum(self) -> None:
+        """
+        Проверяет, что админская группа является форумом (кэшируется только успешная проверка).
+
+        Raises:
+            RuntimeError: Если группа не является форумом
+        """
+        if self._forum_verified:
+            return
+
+        # Блокировка: одновременные сообщения не дублируют запрос get_chat
+        async with self._forum_lock:
+            if self._forum_verified:
+                return
+            try:
+                chat = await self.bot.get_chat(self.admin_group_id)
+            except TelegramError as e:
+                # Сетевая ошибка - проверим при следующем топике
+                logger.warning("Не удалось проверить тип группы: %s", str(e))
+                return
+            self._forum_verified = bool(getattr(chat, "is_forum", False))
+
+        if not self._forum_verified:
+            error = self._not_forum_error()
+            logger.error(str(error))
+            raise error
+
     async def get_or_create_topic(self, user: User) -> int:
         """
         Получает или создает топик для пользователя.
@@ -66,22 +141,9 @@ class AdminPanelService:
         )
 
         try:
-            # Проверяем, является ли группа форумом
-            try:
-                chat = await self.bot.get_chat(self.admin_group_id)
-                if not hasattr(chat, 'is_forum') or not chat.is_forum:
-                    error_msg = (
-                        f"Группа с ID {self.admin_group_id} не является форумом. "
-                        "Для работы админ-панели необходимо:\n"
-                        "1. Преобразовать группу в супергруппу\n"
-                        "2. Включить режим форума в настройках группы\n"
-                        "3. Убедиться, что бот является администратором группы"
-                    )
-                    logger.error(error_msg)
-                    raise RuntimeError(error_msg)
-            except Exception as e:
-                logger.warning("Не удалось проверить тип группы: %s", str(e))
-            
+            # Проверяем, является ли группа форумом (запрос к Telegram - только в первый раз)
+            await self._ensure_forum()
+
             # Создаем топик в админской группе
             forum_topic = await self.bot.create_forum_topic(
                 chat_id=self.admin_group_id,
@@ -110,20 +172,13 @@ class AdminPanelService:
             # Пробрасываем RuntimeError дальше (это наша проверка форума)
             raise
         except TelegramError as e:
-            error_code = getattr(e, 'message', str(e))
-            if "not a forum" in str(e).lower() or "не форум" in str(e).lower():
-                error_msg = (
-                    f"Группа с ID {self.admin_group_id} не является форумом. "
-                    "Для работы админ-панели необходимо:\n"
-                    "1. Преобразовать группу в супергруппу\n"
-                    "2. Включить режим форума в настройках группы (Settings → Topics)\n"
-                    "3. Убедиться, что бот является администратором группы"
-                )
-            else:
-                error_msg = (
-                    f"Ошибка при создании топика для user_id={user_id}: {str(e)}. "
-                    "Убедитесь, что бот является администратором группы и имеет права на создание топиков."
-                )
+            if isinstance(e, BadRequest) and "not a forum" in e.message.lower():
+                # Режим форума отключили после проверки - следующий топик проверит группу заново
+                self._forum_verified = False
+                error = self._not_forum_error()
+                logger.error(str(error))
+                raise error from e
+            error_msg = TOPIC_CREATE_ERROR_TEMPLATE.format(user_id=user_id, error=e)
             logger.error(error_msg, exc_info=True)
             # Не роняем бота, но логируем ошибку
             raise RuntimeError(error_msg) from e
@@ -156,13 +211,14 @@ class AdminPanelService:
                 return
 
             # Определяем, как отправлять сообщение
-            if source == "User":
-                # Для сообщений от пользователя используем forward_message
-                # (сохраняется авторство)
-                await self._forward_user_message(message, topic_id, user)
-            else:
-                # Для AI-сообщений или других источников используем send_message
-                await self._send_ai_message(message, topic_id, user, source)
+            async with self._topic_lock(topic_id):
+                if source == "User":
+                    # Для сообщений от пользователя используем forward_message
+                    # (сохраняется авторство)
+                    await self._forward_user_message(message, topic_id, user)
+                else:
+                    # Для AI-сообщений или других источников используем send_message
+                    await self._send_ai_message(message, topic_id, user, source)
 
             logger.debug(
                 "Сообщение от user_id=%s отправлено в админ-панель (topic_id=%s, source=%s)",
@@ -203,12 +259,13 @@ class AdminPanelService:
                 return
 
             # Отправляем ответ AI в топик с пометкой "ИИ Администратор" (жирным шрифтом)
-            await self.bot.send_message(
-                chat_id=self.admin_group_id,
-                text=f"<b>ИИ Администратор</b>\n{ai_text}",
-                message_thread_id=topic_id,
-                parse_mode="HTML",
-            )
+            async with self._topic_lock(topic_id):
+                await self.bot.send_message(
+                    chat_id=self.admin_group_id,
+                    text=f"<b>ИИ Администратор</b>\n{ai_text}",
+                    message_thread_id=topic_id,
+                    parse_mode="HTML",
+                )
 
             logger.debug(
                 "Ответ AI отправлен в админ-панель для user_id=%s (topic_id=%s)",
@@ -279,7 +336,7 @@ class AdminPanelService:
         # Добавляем пометку об источнике, если это не User
         if source != "User":
             prefix = f"[{source}] "
-            text = f"{prefix}{text}" if text else f"{prefix}(сообщение без текста)"
+            text = f"{prefix}{text}" if text else f"{prefix}{_NO_TEXT}"
 
         await self.bot.send_message(
             chat_id=self.admin_group_id,
@@ -313,6 +370,32 @@ class AdminPanelService:
             message_thread_id=topic_id,
         )
 
+    def _user_strings(self, user: User) -> tuple[str, str]:
+        """
+        Возвращает название топика и блок с информацией о пользователе.
+
+        Строки пересчитываются только при смене имени или username пользователя.
+
+        Args:
+            user: Объект пользователя Telegram
+
+        Returns:
+            Кортеж (название топика, информация о пользователе)
+        """
+        key = (user.full_name, user.username)
+        cached = self._user_fmt_cache.get(user.id)
+        if cached is not None and cached[0] == key:
+            self._user_fmt_cache.move_to_end(user.id)
+            return cached[1], cached[2]
+
+        topic_name = self._build_topic_name(user)
+        user_info = self._build_user_info(user)
+        self._user_fmt_cache[user.id] = (key, topic_name, user_info)
+        self._user_fmt_cache.move_to_end(user.id)
+        if len(self._user_fmt_cache) > USER_FORMAT_CACHE_SIZE:
+            self._user_fmt_cache.popitem(last=False)
+        return topic_name, user_info
+
     def _generate_topic_name(self, user: User) -> str:
         """
         Генерирует название топика для пользователя.
@@ -323,6 +406,11 @@ class AdminPanelService:
         Returns:
             Название топика
         """
+        return self._user_strings(user)[0]
+
+    @staticmethod
+    def _build_topic_name(user: User) -> str:
+        """Собирает название топика для пользователя."""
         # Используем полное имя, если есть, иначе username, иначе ID
         if user.full_name:
             return user.full_name
@@ -341,6 +429,11 @@ class AdminPanelService:
         Returns:
             Отформатированная строка с информацией о пользователе
         """
+        return self._user_strings(user)[1]
+
+    @staticmethod
+    def _build_user_info(user: User) -> str:
+        """Собирает блок с информацией о пользователе."""
         parts = ["👤 Пользователь:"]
 
         if user.full_name:
@@ -361,15 +454,9 @@ class AdminPanelService:
             message: Сообщение Telegram
 
         Returns:
-            Текст сообщения или пустая строка
+            Текст сообщения, подпись к медиа или заглушка, если текста нет
         """
-        if message.text:
-            return message.text
-        elif message.caption:
-            return message.caption
-        else:
-            # Для сообщений без текста (фото, видео и т.д.)
-            return "(сообщение без текста)"
+        return message.text or message.caption or _NO_TEXT
 
     async def enable_manual_mode(self, topic_id: int) -> None:
         """
@@ -468,6 +555,38 @@ class AdminPanelService:
         mode = self.storage.get_mode(user_id)
         return mode == "manual"
 
+    @staticmethod
+    def _format_history_line(msg) -> Optional[str]:
+        """
+        Форматирует сообщение переписки для уведомления CallManager.
+
+        Args:
+            msg: Сообщение LangChain (HumanMessage или AIMessage)
+
+        Returns:
+            Строка вида "<отправитель>: <текст>" или None, если сообщение пропускается
+        """
+        if not isinstance(msg, (HumanMessage, AIMessage)):
+            return None
+
+        content = msg.content
+        if content is None:
+            return None
+        if isinstance(content, list):
+            content = " ".join(str(item) for item in content)
+        else:
+            content = str(content)
+
+        if not content.strip():
+            return None
+
+        # Срез за границей 200 символов пуст, если обрезать нечего
+        trimmed = content[:200]
+        content = trimmed + "..." if content[200:201] else trimmed
+
+        sender = "👤 Клиент" if isinstance(msg, HumanMessage) else "🤖 Агент"
+        return f"{sender}: {content}"
+
     async def send_call_manager_notification(
         self,
         user: User,
@@ -491,51 +610,27 @@ class AdminPanelService:
                 logger.warning("Админ-панель недоступна для уведомления CallManager: %s", str(e))
                 return
 
-            # Формируем сообщение
-            message_lines = [
-                "🔔 Вызов менеджера",
-                "",
-                f"👤 Клиент: {self._generate_topic_name(user)}",
-                f"   ID: {user.id}",
-                "",
-                f"📋 Причина: {reason}",
-                "",
-                "💬 Последние сообщения из переписки:",
-                "",
-            ]
-
-            from langchain_core.messages import HumanMessage, AIMessage
-
-            for msg in recent_messages[-6:]:
-                if not isinstance(msg, (HumanMessage, AIMessage)):
-                    continue
-
-                content = msg.content
-                if content is None:
-                    continue
-                if isinstance(content, list):
-                    content = " ".join(str(item) for item in content)
-                else:
-                    content = str(content)
-
-                if not content.strip():
-                    continue
-
-                if len(content) > 200:
-                    content = content[:200] + "..."
-
-                sender = "👤 Клиент" if isinstance(msg, HumanMessage) else "🤖 Агент"
-                message_lines.append(f"{sender}: {content}")
-                message_lines.append("")
-
-            message_text = "\n".join(message_lines)
+            # Формируем сообщение: каждая строка истории отделена пустой строкой
+            history = "".join(
+                f"\n{line}\n"
+                for line in map(self._format_history_line, recent_messages[-6:])
+                if line is not None
+            )
+            message_text = (
+                "🔔 Вызов менеджера\n\n"
+                f"👤 Клиент: {self._generate_topic_name(user)}\n"
+                f"   ID: {user.id}\n\n"
+                f"📋 Причина: {reason}\n\n"
+                f"💬 Последние сообщения из переписки:\n{history}"
+            )
 
             # Отправляем сообщение в топик
-            await self.bot.send_message(
-                chat_id=self.admin_group_id,
-                text=message_text,
-                message_thread_id=topic_id,
-            )
+            async with self._topic_lock(topic_id):
+                await self.bot.send_message(
+                    chat_id=self.admin_group_id,
+                    text=message_text,
+                    message_thread_id=topic_id,
+                )
 
             logger.info(
                 "Уведомление CallManager отправлено в админ-панель для user_id=%s (topic_id=%s)",
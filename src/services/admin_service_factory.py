@@ -0,0 +1,49 @@
+"""Фабрика для создания общего экземпляра AdminPanelService."""
+
+from telegram import Bot
+
+from src.config.admin_config import get_telegram_admin_group_id
+from src.services.admin_service import AdminPanelService
+from src.services.logger_service import logger
+from src.storage import get_topic_storage
+
+# Глобальный экземпляр админ-панели (общий для всех обработчиков)
+_admin_service: AdminPanelService | None = None
+
+
+def get_admin_service(bot: Bot) -> AdminPanelService | None:
+    """
+    Получает или создает экземпляр AdminPanelService.
+
+    Args:
+        bot: Экземпляр Telegram бота
+
+    Returns:
+        Экземпляр AdminPanelService или None, если админ-панель не настроена
+        или не удалось её инициализировать
+    """
+    global _admin_service
+
+    if _admin_service is not None:
+        return _admin_service
+
+    # ID группы кэшируется в get_telegram_admin_group_id - окружение повторно не читается
+    admin_group_id = get_telegram_admin_group_id()
+    if admin_group_id is None:
+        logger.debug("Админ-панель не настроена (TELEGRAM_ADMIN_GROUP_ID не установлен)")
+        return None
+
+    try:
+        storage = get_topic_storage()
+        _admin_service = AdminPanelService(
+            bot=bot,
+            storage=storage,
+            admin_group_id=admin_group_id,
+        )
+        logger.debug("Инициализирован AdminPanelService")
+    except Exception as e:
+        # Ошибку инициализации не кэшируем - попробуем снова на следующем сообщении
+        logger.warning("Не удалось инициализировать AdminPanelService: %s", str(e))
+        return None
+
+    return _admin_service
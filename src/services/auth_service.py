@@ -4,9 +4,12 @@
 import os
 import time
 import json
+import tempfile
+import threading
 import jwt
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Optional, Tuple
 
 
 class AuthService:
@@ -15,6 +18,17 @@ class AuthService:
     # URL для получения IAM токена через метаданные в Yandex Cloud
     METADATA_IAM_TOKEN_URL = "http://169.254.169.254/computeMetadata/v1/instance/service-accounts/default/token"
     
+    # Файлы-маркеры с результатом проверки метаданных: повторный запуск в той же среде
+    # не ждёт сетевую проверку (до 2 секунд без метаданных)
+    METADATA_MARKER_FILE = os.path.join(tempfile.gettempdir(), ".yc_env_metadata")
+    LOCAL_MARKER_FILE = os.path.join(tempfile.gettempdir(), ".yc_env_local")
+    
+    # Время жизни IAM токена, если источник не вернул expires_in (JWT выписывается на час, берём с запасом)
+    IAM_TOKEN_DEFAULT_TTL = 3300
+    
+    # За сколько секунд до истечения токен обновляется заранее
+    IAM_TOKEN_REFRESH_MARGIN = 60
+    
     def __init__(self):
         """Инициализация сервиса аутентификации"""
         self.api_key = os.getenv("YANDEX_API_KEY_SECRET")
@@ -23,6 +37,17 @@ class AuthService:
         self.service_account_private_key = None
         self._use_metadata = None  # Кэш для проверки доступности метаданных
         
+        # Кэш IAM токена до истечения срока действия
+        self._iam_token: Optional[str] = None
+        self._iam_expiry: float = 0.0
+        self._iam_lock = threading.Lock()
+        
+        # Постоянные HTTP-сессии: соединение (и TLS для IAM API) переиспользуется между запросами токена.
+        # Для сервиса метаданных (обычный HTTP на 169.254.169.254) - отдельная сессия
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._metadata_http = requests.Session()
+        
         if not self.api_key:
             raise ValueError("Не задан YANDEX_API_KEY_SECRET в переменных окружения")
         
@@ -56,28 +81,48 @@ class AuthService:
         if self._use_metadata is not None:
             return self._use_metadata
         
+        if os.path.exists(self.METADATA_MARKER_FILE):
+            self._use_metadata = True
+            return True
+        if os.path.exists(self.LOCAL_MARKER_FILE):
+            self._use_metadata = False
+            return False
+        
         try:
             # Пробуем получить IAM токен через метаданные
             headers = {"Metadata-Flavor": "Google"}
-            response = requests.get(
+            response = self._metadata_http.get(
                 self.METADATA_IAM_TOKEN_URL,
                 headers=headers,
                 timeout=2
             )
             if response.status_code == 200:
                 self._use_metadata = True
+                self._write_env_marker(self.METADATA_MARKER_FILE)
                 print("✅ Обнаружены метаданные Yandex Cloud - используем автоматическую аутентификацию")
                 return True
         except Exception:
             pass
         
         self._use_metadata = False
+        # Отрицательный результат запоминаем только при наличии ключа сервисного аккаунта:
+        # случайный сбой проверки в контейнере не должен навсегда отключить метаданные
+        if self.service_account_private_key:
+            self._write_env_marker(self.LOCAL_MARKER_FILE)
         return False
     
-    def _get_iam_token_from_metadata(self) -> str:
-        """Получить IAM токен через метаданные Yandex Cloud (для Serverless Containers)."""
+    @staticmethod
+    def _write_env_marker(path: str) -> None:
+        """Создать файл-маркер среды (ошибки записи не критичны)."""
+        try:
+            open(path, "a").close()
+        except OSError:
+            pass
+    
+    def _get_iam_token_from_metadata(self) -> Tuple[str, float]:
+        """Получить IAM токен и время его жизни через метаданные Yandex Cloud (для Serverless Containers)."""
         headers = {"Metadata-Flavor": "Google"}
-        response = requests.get(
+        response = self._metadata_http.get(
             self.METADATA_IAM_TOKEN_URL,
             headers=headers,
             timeout=5
@@ -85,7 +130,8 @@ class AuthService:
         response.raise_for_status()
         result = response.json()
         # Пробуем разные варианты поля с токеном (зависит от формата ответа)
-        return result.get("access_token") or result.get("token") or result.get("iamToken")
+        token = result.get("access_token") or result.get("token") or result.get("iamToken")
+        return token, float(result.get("expires_in") or self.IAM_TOKEN_DEFAULT_TTL)
     
     def _create_jwt_token(self) -> str:
         """Создать JWT токен для аутентификации с сервисным аккаунтом (для локальной разработки)."""
@@ -108,23 +154,38 @@ class AuthService:
         )
         return token
     
-    def _get_iam_token_from_jwt(self) -> str:
-        """Получить IAM токен через JWT (для локальной разработки)."""
+    def _get_iam_token_from_jwt(self) -> Tuple[str, float]:
+        """Получить IAM токен и время его жизни через JWT (для локальной разработки)."""
         jwt_token = self._create_jwt_token()
         
         url = "https://iam.api.cloud.yandex.net/iam/v1/tokens"
         headers = {"Content-Type": "application/json"}
         data = {"jwt": jwt_token}
         
-        response = requests.post(url, json=data, headers=headers)
+        response = self._http.post(url, json=data, headers=headers)
         response.raise_for_status()
         
         result = response.json()
-        return result["iamToken"]
+        return result["iamToken"], self.IAM_TOKEN_DEFAULT_TTL
     
     def get_iam_token(self) -> str:
+        """Получить IAM токен (из кэша, пока он не истёк)."""
+        if self._iam_token and time.time() < self._iam_expiry:
+            return self._iam_token
+        
+        # Блокировка: при истечении токена его обновляет только один поток
+        with self._iam_lock:
+            if self._iam_token and time.time() < self._iam_expiry:
+                return self._iam_token
+            
+            token, ttl = self._fetch_iam_token()
+            self._iam_token = token
+            self._iam_expiry = time.time() + ttl - self.IAM_TOKEN_REFRESH_MARGIN
+            return token
+    
+    def _fetch_iam_token(self) -> Tuple[str, float]:
         """
-        Получить IAM токен.
+        Запросить новый IAM токен и время его жизни в секундах.
         Приоритет:
         1. Через метаданные Yandex Cloud (Serverless Containers) - автоматическая аутентификация
         2. Через JWT из файла key.json (локальная разработка)
@@ -4,6 +4,9 @@
 from ..services.logger_service import logger
 from ..services.escalation_service import EscalationService
 
+# EscalationService не хранит состояния - один экземпляр на процесс
+_escalation_service = EscalationService()
+
 
 class CallManagerException(Exception):
     """Исключение для обработки вызова CallManager на нижнем уровне"""
@@ -41,18 +44,19 @@ class CallManagerService:
             logger.error(f"Chat ID: {chat_id}")
         
         # Формируем отчет для менеджера
-        manager_report = f"Отчет для менеджера:\n"
-        manager_report += f"Причина: Критическая ошибка после всех попыток retry\n"
-        manager_report += f"Агент: {agent_name}\n"
-        manager_report += f"Ошибка: {error_message}\n"
-        manager_report += f"Исходное сообщение пользователя: {message}"
+        manager_report = (
+            "Отчет для менеджера:\n"
+            "Причина: Критическая ошибка после всех попыток retry\n"
+            f"Агент: {agent_name}\n"
+            f"Ошибка: {error_message}\n"
+            f"Исходное сообщение пользователя: {message}"
+        )
         
         # Используем EscalationService для формирования ответа
-        escalation_service = EscalationService()
         call_manager_text = f"[CALL_MANAGER]\n{manager_report}"
         
         # Обрабатываем через EscalationService
-        escalation_result = escalation_service.handle(call_manager_text, str(chat_id) if chat_id else "unknown")
+        escalation_result = _escalation_service.handle(call_manager_text, str(chat_id) if chat_id else "unknown")
         
         return escalation_result
 
@@ -1,5 +1,5 @@
 import re
-from datetime import datetime
+from calendar import isleap
 from typing import Optional
 
 
@@ -13,6 +13,25 @@ class DateNormalizer:
         9: "сентября", 10: "октября", 11: "ноября", 12: "декабря"
     }
     
+    # Количество дней в месяце невисокосного года (индекс - номер месяца)
+    DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+    
+    # Паттерны для различных форматов дат (порядок важен)
+    # Поддерживаем различные типы дефисов: обычный (-), длинный (‑), en-dash (–), em-dash (—)
+    PATTERNS = [
+        # YYYY-MM-DD или YYYY‑MM‑DD (с различными типами дефисов)
+        r'(\d{4})[\u002D\u2010\u2011\u2013\u2014\-](\d{1,2})[\u002D\u2010\u2011\u2013\u2014\-](\d{1,2})',
+        # DD.MM.YYYY
+        r'(\d{1,2})\.(\d{1,2})\.(\d{4})',
+        # DD/MM/YYYY
+        r'(\d{1,2})/(\d{1,2})/(\d{4})',
+        # YYYY.MM.DD
+        r'(\d{4})\.(\d{1,2})\.(\d{1,2})',
+    ]
+    
+    # Любая поддерживаемая дата содержит цифры - без них regex-проходы не нужны
+    _DIGIT_RE = re.compile(r'\d')
+    
     @staticmethod
     def normalize_dates(text: str) -> str:
         """
@@ -24,30 +43,24 @@ class DateNormalizer:
         - DD.MM.YYYY (08.11.2025)
         - DD/MM/YYYY (08/11/2025)
         """
-        if not text:
+        if not text or not DateNormalizer._DIGIT_RE.search(text):
             return text
         
-        # Паттерны для различных форматов дат
-        # Поддерживаем различные типы дефисов: обычный (-), длинный (‑), en-dash (–), em-dash (—)
-        patterns = [
-            # YYYY-MM-DD или YYYY‑MM‑DD (с различными типами дефисов)
-            (r'(\d{4})[\u002D\u2010\u2011\u2013\u2014\-](\d{1,2})[\u002D\u2010\u2011\u2013\u2014\-](\d{1,2})', lambda m: DateNormalizer._format_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
-            # DD.MM.YYYY
-            (r'(\d{1,2})\.(\d{1,2})\.(\d{4})', lambda m: DateNormalizer._format_date(int(m.group(3)), int(m.group(2)), int(m.group(1)))),
-            # DD/MM/YYYY
-            (r'(\d{1,2})/(\d{1,2})/(\d{4})', lambda m: DateNormalizer._format_date(int(m.group(3)), int(m.group(2)), int(m.group(1)))),
-            # YYYY.MM.DD
-            (r'(\d{4})\.(\d{1,2})\.(\d{1,2})', lambda m: DateNormalizer._format_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
-        ]
-        
-        result = text
-        for pattern, formatter in patterns:
-            def safe_formatter(match):
-                formatted = formatter(match)
-                return formatted if formatted is not None else match.group(0)
-            result = re.sub(pattern, safe_formatter, result)
-        
-        return result
+        # Все форматы в одной альтернации - текст просматривается один раз
+        return _COMBINED_RE.sub(DateNormalizer._replace_date, text)
+    
+    @staticmethod
+    def _replace_date(match: "re.Match[str]") -> str:
+        """Замена найденной даты по имени сработавшей группы (невалидная дата остаётся как есть)"""
+        name = match.lastgroup
+        # Группы год/месяц/день идут сразу после именованной группы формата
+        base = match.re.groupindex[name]
+        first, month, last = int(match.group(base + 1)), int(match.group(base + 2)), int(match.group(base + 3))
+        if name in _YEAR_FIRST_FORMATS:
+            formatted = DateNormalizer._format_date(first, month, last)
+        else:
+            formatted = DateNormalizer._format_date(last, month, first)
+        return formatted if formatted is not None else match.group(0)
     
     @staticmethod
     def _format_date(year: int, month: int, day: int) -> Optional[str]:
@@ -62,18 +75,25 @@ class DateNormalizer:
         Returns:
             Отформатированная дата или None, если дата невалидна
         """
-        try:
-            # Проверяем валидность даты
-            datetime(year, month, day)
-            
-            # Форматируем в "DD месяца"
-            month_name = DateNormalizer.MONTHS_RU.get(month)
-            if month_name:
-                return f"{day:02d} {month_name}"
+        # Проверяем валидность даты арифметикой, без создания datetime и исключений
+        if year < 1 or not 1 <= month <= 12 or day < 1:
             return None
-        except ValueError:
-            # Некорректная дата, возвращаем None (не заменяем)
+        max_day = DateNormalizer.DAYS_IN_MONTH[month] + (month == 2 and isleap(year))
+        if day > max_day:
             return None
+        
+        # Форматируем в "DD месяца"
+        return f"{day:02d} {DateNormalizer.MONTHS_RU[month]}"
+
+
+# Имена форматов в том же порядке, что и DateNormalizer.PATTERNS
+_FORMAT_NAMES = ("iso", "dmy_dot", "dmy_slash", "ymd_dot")
+_YEAR_FIRST_FORMATS = frozenset({"iso", "ymd_dot"})
+
+# Единое скомпилированное выражение для всех форматов дат
+_COMBINED_RE = re.compile("|".join(
+    f"(?P<{name}>{pattern})" for name, pattern in zip(_FORMAT_NAMES, DateNormalizer.PATTERNS)
+))
 
 
 def normalize_dates_in_text(text: str) -> str:
@@ -1,12 +1,26 @@
 """
 Сервис для отладки и логирования запросов
 """
-import json
 import os
+import queue
+import socket
+import threading
 from datetime import datetime
+import orjson
 from .logger_service import logger
 
 
+# Максимальное количество записей, ожидающих записи на диск
+DEBUG_QUEUE_MAXSIZE = 1024
+
+# Размер буфера файла debug логов (запись на диск - раз на пачку записей)
+DEBUG_FILE_BUFFER_SIZE = 1 << 16
+
+# Куда отправляются debug логи (переменная DEBUG_LOGS_SINK):
+# file - NDJSON файлы в debug_logs, unix_dgram - датаграммы в UNIX-сокет сборщика, null - никуда
+DEBUG_LOG_SINKS = ("file", "unix_dgram", "null")
+
+
 class DebugService:
     """Сервис для сохранения debug-логов"""
     
@@ -16,56 +30,124 @@ class DebugService:
         # В облачной версии (контейнере) отключаем сохранение логов
         self.debug_enabled = os.getenv('ENABLE_DEBUG_LOGS', 'false').lower() == 'true'
         self.debug_logs_dir = "debug_logs"
+        self.dropped_count = 0
+        self._queue: "queue.Queue | None" = None
+        self._socket: "socket.socket | None" = None
+        self._socket_path = os.getenv('DEBUG_LOGS_SOCKET', '/tmp/debug_logs.sock')
+        
+        # Открытый файл текущего часа (используется только фоновым потоком)
+        self._fh = None
+        self._current_path: "str | None" = None
+        self._current_hour: "tuple | None" = None
         
         if self.debug_enabled:
-            # Создаем папку для логов, если её нет (только если включено)
-            try:
-                os.makedirs(self.debug_logs_dir, exist_ok=True)
-            except Exception as e:
-                logger.warning(f"Не удалось создать папку {self.debug_logs_dir}: {str(e)}")
+            self.sink = self._resolve_sink()
+            if self.sink == "null":
+                self.debug_enabled = False
+            elif self.sink == "unix_dgram":
+                # Одна неблокирующая датаграмма на запись: буферизацию берёт на себя ядро
+                self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self._socket.setblocking(False)
+            else:
+                self._start_file_writer()
         else:
+            self.sink = "null"
             logger.debug("Debug логи отключены (работа в контейнере)")
     
+    def _resolve_sink(self) -> str:
+        """Определить приемник debug логов по DEBUG_LOGS_SINK"""
+        sink = os.getenv('DEBUG_LOGS_SINK', 'file').lower()
+        if sink not in DEBUG_LOG_SINKS:
+            logger.warning(f"Неизвестный DEBUG_LOGS_SINK={sink}, используем file")
+            return "file"
+        if sink == "unix_dgram" and not hasattr(socket, "AF_UNIX"):
+            logger.warning("UNIX-сокеты недоступны на этой платформе, используем file")
+            return "file"
+        return sink
+    
+    def _start_file_writer(self):
+        """Подготовить запись в файлы: папка и фоновый поток-писатель"""
+        # Создаем папку для логов, если её нет (только если включено)
+        try:
+            os.makedirs(self.debug_logs_dir, exist_ok=True)
+        except Exception as e:
+            logger.warning(f"Не удалось создать папку {self.debug_logs_dir}: {str(e)}")
+        
+        # Запись на диск идёт в фоновом потоке, вызывающий код только кладёт запись в очередь
+        self._queue = queue.Queue(maxsize=DEBUG_QUEUE_MAXSIZE)
+        threading.Thread(target=self._writer_loop, name="debug-log-writer", daemon=True).start()
+    
     def save_request(self, payload: dict, chat_id: str):
         """Сохранить запрос к LLM в файл для дебага"""
         if not self.debug_enabled:
             return
-        
-        try:
-            # Убеждаемся, что папка существует
-            os.makedirs(self.debug_logs_dir, exist_ok=True)
-            
-            # Создаем имя файла с временной меткой
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(self.debug_logs_dir, f"llm_request_{chat_id}_{timestamp}.json")
-            
-            # Сохраняем payload как есть, без форматирования
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, ensure_ascii=False, indent=None, separators=(',', ':'))
-            
-            logger.debug("Запрос к LLM сохранен", filename)
-            
-        except Exception as e:
-            logger.error("Ошибка при сохранении запроса", str(e))
+        self._enqueue("request", payload, chat_id)
     
     def save_response(self, response: dict, chat_id: str):
         """Сохранить ответ от LLM в файл для дебага"""
         if not self.debug_enabled:
             return
-        
+        self._enqueue("response", response, chat_id)
+    
+    def _enqueue(self, kind: str, payload: dict, chat_id: str):
+        """Передать запись в приемник (при переполнении запись отбрасывается)"""
         try:
-            # Убеждаемся, что папка существует
+            # Сериализуем сразу: вызывающий код может изменить payload после возврата.
+            # orjson отдаёт компактный UTF-8 сразу в bytes
+            data = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+            if self._socket is not None:
+                self._socket.sendto(self._format_record(kind, chat_id, datetime.now(), data), self._socket_path)
+            else:
+                self._queue.put_nowait((kind, chat_id, datetime.now(), data))
+        except (queue.Full, BlockingIOError):
+            self._count_dropped()
+        except OSError as e:
+            # Сборщик не запущен или запись больше допустимой датаграммы - debug лог не критичен
+            self._count_dropped()
+            logger.debug("Не удалось отправить debug лог в сокет", str(e))
+        except Exception as e:
+            logger.error("Ошибка при сохранении debug лога", str(e))
+    
+    def _count_dropped(self):
+        """Учесть отброшенную запись"""
+        self.dropped_count += 1
+        logger.debug("Приемник debug логов переполнен, запись отброшена", f"dropped={self.dropped_count}")
+    
+    @staticmethod
+    def _format_record(kind: str, chat_id: str, created_at: datetime, data: bytes) -> bytes:
+        """Собрать NDJSON строку записи: payload уже сериализован и дописывается в объект метаданных"""
+        meta = orjson.dumps({"ts": created_at.isoformat(), "chat_id": str(chat_id), "kind": kind})
+        return meta[:-1] + b',"payload":' + data + b'}\n'
+    
+    def _get_fh(self, created_at: datetime):
+        """Получить файл для записи: один NDJSON файл на час, старый закрывается при смене часа"""
+        # Имя файла форматируется только при смене часа, а не для каждой записи
+        hour = (created_at.year, created_at.month, created_at.day, created_at.hour)
+        if hour != self._current_hour:
+            if self._fh is not None:
+                self._fh.close()
+            # Папка создана в __init__; здесь - раз в час на случай, если её удалили на ходу
             os.makedirs(self.debug_logs_dir, exist_ok=True)
+            self._current_path = os.path.join(self.debug_logs_dir, f"llm_{created_at.strftime('%Y%m%d_%H')}.jsonl")
+            self._fh = open(self._current_path, 'ab', buffering=DEBUG_FILE_BUFFER_SIZE)
+            self._current_hour = hour
+        return self._fh
+    
+    def _writer_loop(self):
+        """Фоновый поток: дописывает накопленные записи в NDJSON файл"""
+        while True:
+            # Ждём первую запись, затем забираем всё, что успело накопиться
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
             
-            # Создаем имя файла с временной меткой
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = os.path.join(self.debug_logs_dir, f"llm_response_{chat_id}_{timestamp}.json")
-            
-            # Сохраняем response как есть, без форматирования
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(response, f, ensure_ascii=False, indent=None, separators=(',', ':'))
-            
-            logger.debug("Ответ от LLM сохранен", filename)
-            
-        except Exception as e:
-            logger.error("Ошибка при сохранении ответа", str(e))
\ No newline at end of file
+            try:
+                for kind, chat_id, created_at, data in batch:
+                    self._get_fh(created_at).write(self._format_record(kind, chat_id, created_at, data))
+                self._fh.flush()
+                logger.debug("Debug логи LLM сохранены", f"records={len(batch)}, file={self._current_path}")
+            except Exception as e:
+                logger.error("Ошибка при записи debug лога", str(e))
@@ -1,9 +1,16 @@
 """
 Сервис для проверки типов ошибок
 """
+import re
 from typing import Optional
 
 
+# Признаки ошибок: поиск без учета регистра, без копии текста в нижнем регистре
+_INTERNAL_ERROR_RE = re.compile(r"internal server error", re.IGNORECASE)
+_INTERNAL_RE = re.compile(r"internal", re.IGNORECASE)
+_ESCALATE_RE = re.compile(r"run is failed and don't have a message result", re.IGNORECASE)
+
+
 class ErrorChecker:
     """Класс для проверки различных типов ошибок"""
     
@@ -18,11 +25,11 @@ class ErrorChecker:
         if not error_message:
             return False
         
-        error_lower = str(error_message).lower()
+        error_text = str(error_message)
+        # "500: internal server error" покрывается общей проверкой подстроки
         return (
-            "500: internal server error" in error_lower or
-            "internal server error" in error_lower or
-            "500" in error_lower and "internal" in error_lower
+            _INTERNAL_ERROR_RE.search(error_text) is not None
+            or ("500" in error_text and _INTERNAL_RE.search(error_text) is not None)
         )
     
     @staticmethod
@@ -36,8 +43,7 @@ class ErrorChecker:
         if not error_message:
             return False
         
-        error_lower = str(error_message).lower()
-        return "run is failed and don't have a message result" in error_lower
+        return _ESCALATE_RE.search(str(error_message)) is not None
 
 
 
@@ -2,8 +2,24 @@
 Сервис обработки эскалации диалога на менеджера.
 """
 
+from itertools import chain
 from typing import Dict
 
+# Ответ пользователю при передаче диалога менеджеру
+_USER_MESSAGE = "Пару минут, уточняю ваш вопрос и вернусь в ближайшее время 🤍"
+_ALERT_PREFIX = "--- MANAGER ALERT ---\nКлиент: "
+
+# Типы строк отчета для менеджера
+_REPORT_HEADER, _HISTORY_HEADER, _REASON, _MESSAGE, _OTHER = range(5)
+
+# Префиксы строк по первому символу: обычные строки отсекаются одним поиском в словаре
+_LINE_PREFIXES = {
+    'О': (('Отчет для менеджера', _REPORT_HEADER),),
+    'И': (('История последних', _HISTORY_HEADER),),
+    'П': (('Причина:', _REASON),),
+    '-': (('- user:', _MESSAGE), ('- assistant:', _MESSAGE)),
+}
+
 
 class EscalationService:
     """Отвечает только за обработку сигнала эскалации [CALL_MANAGER]."""
@@ -17,8 +33,9 @@ class EscalationService:
         :return: Словарь с сообщением для пользователя и алертом для менеджера
         """
         text = llm_response_text or ""
-        prefix = "[CALL_MANAGER]"
-        manager_report_text = text[text.find(prefix) + len(prefix):].lstrip()
+        _, prefix, after = text.partition("[CALL_MANAGER]")
+        # Без маркера весь текст считается отчетом
+        manager_report_text = (after if prefix else text).lstrip()
         
         # Переворачиваем порядок строк с сообщениями (старое сверху, новое снизу)
         manager_report_text = self._reverse_message_history(manager_report_text)
@@ -27,8 +44,8 @@ class EscalationService:
         user_link = f"[{client_telegram_id}](tg://user?id={client_telegram_id})"
 
         return {
-            "user_message": "Пару минут, уточняю ваш вопрос и вернусь в ближайшее время 🤍",
-            "manager_alert": f"--- MANAGER ALERT ---\nКлиент: {user_link}\n\n{manager_report_text}",
+            "user_message": _USER_MESSAGE,
+            "manager_alert": "".join((_ALERT_PREFIX, user_link, "\n\n", manager_report_text)),
         }
     
     def _reverse_message_history(self, text: str) -> str:
@@ -52,30 +69,27 @@ class EscalationService:
         
         for line in lines:
             stripped = line.strip()
+            kind = self._classify_line(stripped)
             
             # Заголовок отчета
-            if 'Отчет для менеджера' in stripped:
+            if kind == _REPORT_HEADER:
                 report_header = "**Отчет для менеджера:**"
-                continue
             
             # Заголовок истории
-            if 'История последних' in stripped:
+            elif kind == _HISTORY_HEADER:
                 history_header = f"**{stripped}**"
                 in_messages = True
                 in_reason = False
-                continue
             
             # Блок причины
-            if stripped.startswith('Причина:'):
+            elif kind == _REASON:
                 in_reason = True
                 in_messages = False
                 # Делаем "Причина:" жирным
-                reason_text = stripped.replace('Причина:', '**Причина:**', 1)
-                reason_block.append(reason_text)
-                continue
+                reason_block.append('**Причина:**' + stripped[len('Причина:'):])
             
             # Строки с сообщениями
-            if stripped.startswith('- user:') or stripped.startswith('- assistant:'):
+            elif kind == _MESSAGE:
                 in_messages = True
                 in_reason = False
                 message_lines.append(line)
@@ -85,26 +99,24 @@ class EscalationService:
                 # Продолжение сообщения
                 message_lines.append(line)
         
-        # Переворачиваем строки с сообщениями
-        if message_lines:
-            message_lines = message_lines[::-1]
-        
-        # Собираем результат с пустыми строками между блоками
-        result = []
-        
-        if report_header:
-            result.append(report_header)
-            result.append("")  # Пустая строка
-        
-        if history_header:
-            result.append(history_header)
-        
-        if message_lines:
-            result.extend(message_lines)
-            result.append("")  # Пустая строка
-        
-        if reason_block:
-            result.extend(reason_block)
+        # Собираем результат с пустыми строками между блоками одним join без промежуточного списка
+        return '\n'.join(chain(
+            (report_header, "") if report_header else (),
+            (history_header,) if history_header else (),
+            # Строки с сообщениями идут в обратном порядке (старое сверху), без копии списка
+            chain(reversed(message_lines), ("",)) if message_lines else (),
+            reason_block,
+        ))
+    
+    @staticmethod
+    def _classify_line(stripped: str) -> int:
+        """
+        Определяет тип строки отчета по ее началу.
         
-        return '\n'.join(result)
-
+        :param stripped: Строка без пробелов по краям
+        :return: Один из типов _REPORT_HEADER, _HISTORY_HEADER, _REASON, _MESSAGE, _OTHER
+        """
+        for prefix, kind in _LINE_PREFIXES.get(stripped[:1], ()):
+            if stripped.startswith(prefix):
+                return kind
+        return _OTHER
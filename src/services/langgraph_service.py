@@ -1,10 +1,18 @@
 """
 Сервис для работы с LangGraph (Responses API)
 """
-from typing import Optional
+import hashlib
+from functools import lru_cache
+from typing import Hashable, Optional, Tuple
 from .responses_api.config import ResponsesAPIConfig
 
 
+@lru_cache(maxsize=1)
+def _get_default_config() -> ResponsesAPIConfig:
+    """Конфигурация по умолчанию: переменные окружения читаются один раз на процесс"""
+    return ResponsesAPIConfig()
+
+
 class LangGraphService:
     """Сервис для работы с LangGraph (Responses API)"""
     
@@ -13,9 +21,29 @@ class LangGraphService:
         Инициализация сервиса
         
         Args:
-            config: Конфигурация Responses API (если None, создаётся новая)
+            config: Конфигурация Responses API (если None, используется общая конфигурация по умолчанию)
         """
         # Используем общую конфигурацию для избежания дублирования
-        self.config = config or ResponsesAPIConfig()
+        self.config = config or _get_default_config()
         self.folder_id = self.config.folder_id
         self.api_key = self.config.api_key
+    
+    def cache_key(self) -> Tuple[Hashable, ...]:
+        """
+        Ключ для кэширования агентов и графов, построенных на этом сервисе
+        
+        Сервисы с одинаковой конфигурацией дают одинаковый ключ, поэтому
+        агенты не создаются повторно для функционально идентичного сервиса.
+        API ключ входит в ключ только в виде хэша.
+        
+        Returns:
+            Кортеж параметров конфигурации
+        """
+        api_key_hash = hashlib.sha256((self.api_key or "").encode("utf-8")).hexdigest()
+        return (
+            self.folder_id,
+            self.config.model_uri,
+            self.config.temperature,
+            self.config.max_output_tokens,
+            api_key_hash,
+        )
@@ -1,9 +1,90 @@
 import re
+from bisect import bisect_right
+from typing import List, Optional, Tuple
 
 
 class LinkConverter:
     """Сервис для преобразования ссылок yclients.com в HTML-гиперссылки"""
     
+    # Паттерн для поиска ссылок yclients.com
+    # Ищем http/https ссылки, содержащие yclients.com
+    # Может быть в скобках или без них
+    # Простой паттерн без сложного lookbehind
+    PATTERN = r'(\(?)(https?://[^\s\)<>]+yclients\.com[^\s\)<>]+)(\)?)'
+    
+    @staticmethod
+    def find_anchor_spans(text: str) -> Tuple[List[int], List[int]]:
+        """
+        Находит диапазоны уже созданных тегов <a href="...">...</a> за один проход
+        
+        Args:
+            text: Исходный текст
+            
+        Returns:
+            Отсортированные списки начал и концов тегов (незакрытый тег длится до конца текста)
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        pos = text.find('<a href="')
+        while pos != -1:
+            close = text.find('</a>', pos)
+            end = len(text) if close == -1 else close + len('</a>')
+            starts.append(pos)
+            ends.append(end)
+            pos = text.find('<a href="', end)
+        return starts, ends
+    
+    @staticmethod
+    def is_inside_spans(spans: Tuple[List[int], List[int]], pos: int) -> bool:
+        """
+        Проверяет бинарным поиском, попадает ли позиция в один из тегов <a>
+        
+        Args:
+            spans: Результат find_anchor_spans для того же текста
+            pos: Позиция в тексте
+            
+        Returns:
+            True, если позиция внутри тега <a>
+        """
+        starts, ends = spans
+        index = bisect_right(starts, pos) - 1
+        return index >= 0 and pos < ends[index]
+    
+    @staticmethod
+    def find_link(text: str, pos: int = 0) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Находит следующую ссылку yclients.com без прохода regex по каждой позиции
+        
+        Совпадает с PATTERN: кандидаты ищутся через str.find("http"), затем
+        проверяется участок URL до первого пробела, ")", "<" или ">".
+        
+        Args:
+            text: Исходный текст
+            pos: Позиция, с которой начинается поиск
+            
+        Returns:
+            (начало совпадения, начало URL, конец URL, конец совпадения) или None
+        """
+        i = text.find("http", pos)
+        while i != -1:
+            if text.startswith("://", i + 4):
+                url_body = i + 7
+            elif text.startswith("s://", i + 4):
+                url_body = i + 8
+            else:
+                i = text.find("http", i + 1)
+                continue
+            
+            terminator = _URL_END_RE.search(text, url_body)
+            url_end = terminator.start() if terminator else len(text)
+            # До и после "yclients.com" в URL должен быть хотя бы один символ
+            if text.find("yclients.com", url_body + 1, url_end - 1) != -1:
+                start = i - 1 if i > pos and text[i - 1] == "(" else i
+                end = url_end + 1 if text.startswith(")", url_end) else url_end
+                return start, i, url_end, end
+            i = text.find("http", i + 1)
+        return None
+    
     @staticmethod
     def convert_yclients_links(text: str) -> str:
         """
@@ -19,34 +100,35 @@ class LinkConverter:
         Returns:
             Текст с преобразованными ссылками в HTML-формате
         """
-        if not text:
+        if not text or "yclients.com" not in text:
             return text
         
-        # Паттерн для поиска ссылок yclients.com
-        # Ищем http/https ссылки, содержащие yclients.com
-        # Может быть в скобках или без них
-        # Простой паттерн без сложного lookbehind
-        pattern = r'(\(?)(https?://[^\s\)<>]+yclients\.com[^\s\)<>]+)(\)?)'
-        
-        def replace_link(match):
-            # Проверяем, не находимся ли мы уже внутри HTML-тега <a>
-            start_pos = match.start()
-            # Проверяем, есть ли перед этой позицией незакрытый тег <a href="
-            text_before = text[:start_pos]
-            # Считаем открывающие и закрывающие теги <a>
-            open_tags = text_before.count('<a href="')
-            close_tags = text_before.count('</a>')
-            # Если есть незакрытый тег <a>, значит мы внутри уже обработанной ссылки
-            if open_tags > close_tags:
-                return match.group(0)  # Возвращаем исходный текст без изменений
-            
-            url = match.group(2)  # Извлекаем URL (группа 1 - открывающая скобка, группа 3 - закрывающая скобка)
-            # Создаем HTML-гиперссылку (скобки не включаем в результат)
-            return f'<a href="{url}">Страница мастера</a>'
+        # Теги <a> индексируются один раз, а не пересчитываются для каждой ссылки
+        spans = LinkConverter.find_anchor_spans(text)
         
-        result = re.sub(pattern, replace_link, text)
+        chunks = []
+        pos = 0
+        found = LinkConverter.find_link(text, pos)
+        while found is not None:
+            start, url_start, url_end, end = found
+            chunks.append(text[pos:start])
+            if LinkConverter.is_inside_spans(spans, start):
+                # Позиция внутри тега <a> - это уже обработанная ссылка, оставляем как есть
+                chunks.append(text[start:end])
+            else:
+                # Создаем HTML-гиперссылку (скобки не включаем в результат)
+                chunks.append(f'<a href="{text[url_start:url_end]}">Страница мастера</a>')
+            pos = end
+            found = LinkConverter.find_link(text, pos)
         
-        return result
+        if not chunks:
+            return text
+        chunks.append(text[pos:])
+        return "".join(chunks)
+
+
+# Конец URL в ссылке: пробельный символ, ")", "<" или ">" (как [^\s\)<>] в PATTERN)
+_URL_END_RE = re.compile(r'[\s\)<>]')
 
 
 def convert_yclients_links_in_text(text: str) -> str:
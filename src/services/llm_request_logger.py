@@ -4,24 +4,139 @@
 """
 import os
 import json
+import atexit
+import hashlib
+from collections import deque
+import time
+import traceback
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from threading import Lock
+from typing import Optional, Dict, Any, List, BinaryIO, Tuple, Union
+from threading import Event, Lock, Thread
+import orjson
+
+
+# Размер буфера файла лога: данные пишутся на диск пачками, а не на каждое событие
+LOG_FILE_BUFFER_SIZE = 1 << 16
+
+# Максимальное количество событий, ожидающих записи фоновым потоком
+LOG_QUEUE_MAXSIZE = 4096
+
+# Сколько секунд ждать записи оставшихся событий при завершении процесса
+LOG_CLOSE_TIMEOUT = 5.0
+
+# Типы ожидаемых ошибок, для которых в лог пишется только тип и сообщение, без трейсбека
+LOG_NO_TRACEBACK_TYPES: Tuple[type, ...] = (ValueError, KeyError, AttributeError)
+
+# Разделитель блоков лога (строится один раз, а не в каждой записи)
+_SEP = "=" * 80
+
+# Завершение файла запроса (уже в UTF-8)
+_FOOTER = f"\n{_SEP}\nREQUEST COMPLETED\n{_SEP}\n".encode('utf-8')
+
+
+def _now_iso() -> str:
+    """Текущее локальное время в ISO формате (как datetime.now().isoformat(), но без создания datetime)"""
+    seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+    tm = time.localtime(seconds)
+    return (
+        f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}.{nanoseconds // 1000:06d}"
+    )
+
+
+def _dumps_bytes(obj: Any) -> bytes:
+    """Сериализовать данные для лога в читаемый JSON с отступами (сразу в UTF-8, несериализуемое - через str)"""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+
+def _dumps(obj: Any) -> str:
+    """Сериализовать данные для лога в читаемый JSON с отступами (несериализуемое - через str)"""
+    return _dumps_bytes(obj).decode()
+
+
+@lru_cache(maxsize=None)
+def _model_json_schema(model: type) -> Dict[str, Any]:
+    """JSON схема Pydantic модели: классы инструментов неизменны, схема строится один раз"""
+    return model.model_json_schema()
+
+
+@lru_cache(maxsize=None)
+def _tool_schema_entry(tool: type) -> Tuple[Dict[str, Any], str]:
+    """Схема инструмента в формате API и её JSON для лога (кэшируется по классу инструмента)"""
+    schema = _model_json_schema(tool)
+    tool_json = {
+        'type': 'function',
+        'function': {
+            'name': schema.get('title', tool.__name__),
+            'description': schema.get('description', ''),
+            'parameters': {
+                'type': 'object',
+                'properties': schema.get('properties', {}),
+                'required': schema.get('required', [])
+            }
+        }
+    }
+    return tool_json, _dumps(tool_json)
+
+
+# Маркер отсутствующего атрибута: getattr с ним заменяет пару hasattr + getattr
+_MISSING = object()
+
+
+def _tools_fingerprint(tools: List[Any]) -> str:
+    """Отпечаток набора инструментов: инструменты агента - долгоживущие объекты, поэтому достаточно их id"""
+    return hashlib.blake2b(b''.join(id(tool).to_bytes(8, 'little') for tool in tools), digest_size=8).hexdigest()
+
+
+# Нормализация ролей сообщений (роли вне словаря пишутся как есть)
+_ROLE_MAP = {'user': 'user', 'assistant': 'assistant', 'model': 'assistant'}
+
+
+# Известные атрибуты с информацией о токенах (проверяются первыми)
+_USAGE_ATTRS = (
+    'usage',
+    'usage_tokens',
+    'tokens',
+    'token_usage',
+    'input_tokens',
+    'output_tokens',
+    'total_tokens',
+    'prompt_tokens',
+    'completion_tokens',
+)
+
+# Атрибуты с токенами по типу ответа: dir() просматривается один раз на тип, а не на каждый ответ
+_USAGE_ATTRS_BY_TYPE: Dict[type, Tuple[str, ...]] = {}
+
+
+def _usage_attrs(raw_response: Any) -> Tuple[str, ...]:
+    """Имена атрибутов ответа, связанных с токенами: известные, затем найденные через dir()"""
+    attrs = _USAGE_ATTRS_BY_TYPE.get(type(raw_response))
+    if attrs is None:
+        found = []
+        try:
+            for attr in dir(raw_response):
+                if attr.startswith('_') or attr in _USAGE_ATTRS:
+                    continue
+                attr_lower = attr.lower()
+                if 'token' in attr_lower or 'usage' in attr_lower:
+                    found.append(attr)
+        except Exception:
+            pass
+        attrs = _USAGE_ATTRS_BY_TYPE.setdefault(type(raw_response), _USAGE_ATTRS + tuple(found))
+    return attrs
 
 
 class LLMRequestLogger:
     """Логгер для записи реальных запросов и ответов LLM через SDK"""
     
-    _instance = None
-    _lock = Lock()
+    # Единственный экземпляр создаётся сразу после объявления класса (при импорте модуля),
+    # поэтому повторные вызовы LLMRequestLogger() обходятся без блокировки и проверок
+    _instance: "LLMRequestLogger"
     
     def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
         return cls._instance
     
     def __init__(self):
@@ -44,6 +159,24 @@ class LLMRequestLogger:
         self.request_start_time: Optional[datetime] = None
         self._file_lock = Lock()
         self._request_counter = 0
+        self.dropped_count = 0
+        
+        # Схемы SDK инструментов по (тип, имя): набор инструментов агента не меняется между запросами
+        self._tool_schema_cache: Dict[Tuple[type, Any], Tuple[Dict[str, Any], str]] = {}
+        
+        # Записанные наборы инструментов: отпечаток -> (номер запроса, файл лога)
+        self._tools_seen: Dict[str, Tuple[int, str]] = {}
+        
+        # Запись в файлы идёт в фоновом потоке: вызывающий код только добавляет событие в очередь.
+        # deque.append потокобезопасен без блокировки, а _wakeup будит поток-писатель.
+        # Открытый файл текущего запроса принадлежит фоновому потоку
+        self._queue: "deque | None" = None
+        self._wakeup = Event()
+        self._fh: Optional[BinaryIO] = None
+        if self.logging_enabled:
+            self._queue = deque()
+            Thread(target=self._writer_loop, name="llm-log-writer", daemon=True).start()
+            atexit.register(self.close)
         
         self._initialized = True
     
@@ -53,37 +186,38 @@ class LLMRequestLogger:
             return None
         
         with self._file_lock:
-            # Закрываем предыдущий файл если был
-            if self.current_log_file:
-                try:
-                    with open(self.current_log_file, 'a', encoding='utf-8') as f:
-                        f.write(f"\n{'='*80}\n")
-                        f.write(f"REQUEST COMPLETED\n")
-                        f.write(f"{'='*80}\n")
-                except:
-                    pass
-            
             # Создаём новый файл для текущего запроса
             self._request_counter += 1
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+            seconds, nanoseconds = divmod(time.time_ns(), 1_000_000_000)
+            timestamp = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(seconds))}_{nanoseconds // 1_000_000:03d}"
             self.current_log_file = self.logs_dir / f"llm_request_{timestamp}.log"
             self.request_start_time = datetime.now()
             
-            # Записываем заголовок запроса
-            try:
-                with open(self.current_log_file, 'w', encoding='utf-8') as f:
-                    f.write(f"{'='*80}\n")
-                    f.write(f"NEW REQUEST STARTED\n")
-                    f.write(f"{'='*80}\n")
-                    f.write(f"Request ID: {self._request_counter}\n")
-                    f.write(f"Start Time: {self.request_start_time.isoformat()}\n")
-                    f.write(f"Log File: {self.current_log_file.name}\n")
-                    f.write(f"{'='*80}\n\n")
-            except Exception as e:
-                print(f"Ошибка создания файла лога: {e}")
+            # Заголовок запроса; предыдущий файл закроет фоновый поток
+            header = (
+                f"{_SEP}\n"
+                f"NEW REQUEST STARTED\n"
+                f"{_SEP}\n"
+                f"Request ID: {self._request_counter}\n"
+                f"Start Time: {self.request_start_time.isoformat()}\n"
+                f"Log File: {self.current_log_file.name}\n"
+                f"{_SEP}\n\n"
+            )
+            # Событие кладётся под блокировкой, чтобы порядок файлов в очереди совпадал с порядком запросов
+            self._put(("open", self.current_log_file, header))
             
             return self.current_log_file
     
+    def close(self, timeout: float = LOG_CLOSE_TIMEOUT):
+        """Дописать оставшиеся события и закрыть файл текущего запроса (вызывается при завершении процесса)"""
+        if self._queue is None:
+            return
+        done = Event()
+        # Служебное событие добавляется без проверки лимита очереди
+        self._queue.append(("close", done))
+        self._wakeup.set()
+        done.wait(timeout)
+    
     def _get_log_file(self) -> Optional[Path]:
         """Получить файл лога для текущего запроса"""
         if not self.logging_enabled:
@@ -92,8 +226,13 @@ class LLMRequestLogger:
             return self.start_new_request()
         return self.current_log_file
     
-    def _write_raw(self, data: str):
-        """Записать сырые данные в файл"""
+    def _write_raw(self, data: Union[str, bytes], flush: bool = False):
+        """
+        Записать сырые данные в файл (текст или уже закодированные в UTF-8 байты)
+        
+        Данные передаются фоновому потоку; на диск они сбрасываются
+        при flush=True (конец цикла запроса) и при закрытии файла.
+        """
         if not self.logging_enabled:
             return
         
@@ -101,14 +240,71 @@ class LLMRequestLogger:
         if log_file is None:
             return
         
-        with self._file_lock:
-            try:
-                with open(log_file, 'a', encoding='utf-8') as f:
-                    f.write(data)
-                    f.write('\n')
-                    f.flush()
-            except Exception as e:
-                print(f"Ошибка записи в лог: {e}")
+        self._put(("write", data, flush))
+    
+    def _put(self, event: tuple):
+        """Положить событие в очередь фонового потока (при переполнении событие отбрасывается)"""
+        if len(self._queue) >= LOG_QUEUE_MAXSIZE:
+            self.dropped_count += 1
+            return
+        self._queue.append(event)
+        # Event.set берёт внутреннюю блокировку - будим поток, только если он ещё не разбужен
+        if not self._wakeup.is_set():
+            self._wakeup.set()
+    
+    def _writer_loop(self):
+        """Фоновый поток: записывает события пачками, сбрасывая буфер один раз на пачку"""
+        while True:
+            # Ждём сигнала, затем забираем всё, что успело накопиться.
+            # Сигнал сбрасывается до разбора очереди: событие, добавленное после, разбудит поток снова
+            self._wakeup.wait()
+            self._wakeup.clear()
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.popleft())
+                except IndexError:
+                    break
+            
+            need_flush = False
+            for event in batch:
+                kind = event[0]
+                try:
+                    if kind == "write":
+                        if self._fh is not None:
+                            # Текст кодируется в UTF-8 один раз и пишется в двоичный буфер напрямую
+                            data = event[1]
+                            self._fh.write(data if isinstance(data, bytes) else data.encode('utf-8'))
+                            self._fh.write(b'\n')
+                            need_flush = need_flush or event[2]
+                    elif kind == "open":
+                        self._close_current_file()
+                        need_flush = False
+                        self._fh = open(event[1], 'wb', buffering=LOG_FILE_BUFFER_SIZE)
+                        self._fh.write(event[2].encode('utf-8'))
+                    elif kind == "close":
+                        self._close_current_file()
+                        need_flush = False
+                        event[1].set()
+                except Exception as e:
+                    print(f"Ошибка записи в лог: {e}")
+            
+            if need_flush and self._fh is not None:
+                try:
+                    self._fh.flush()
+                except Exception as e:
+                    print(f"Ошибка записи в лог: {e}")
+    
+    def _close_current_file(self):
+        """Дописать завершение запроса и закрыть файл (вызывается фоновым потоком)"""
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(_FOOTER)
+            self._fh.close()
+        except Exception:
+            pass
+        self._fh = None
     
     def log_request_to_llm(
         self,
@@ -130,12 +326,15 @@ class LLMRequestLogger:
             tools: Список инструментов (классы инструментов)
             messages: Список сообщений (conversation_history)
         """
-        timestamp = datetime.now().isoformat()
-        log_entry = f"\n{'='*80}\n"
-        log_entry += f"[{timestamp}] REQUEST TO LLM (EXACT DATA SENT TO API)\n"
-        log_entry += f"{'='*80}\n"
-        log_entry += f"Agent: {agent_name}\n"
-        log_entry += "\n"
+        if not self.logging_enabled:
+            return
+        
+        timestamp = _now_iso()
+        parts = [f"\n{_SEP}\n"]
+        parts.append(f"[{timestamp}] REQUEST TO LLM (EXACT DATA SENT TO API)\n")
+        parts.append(f"{_SEP}\n")
+        parts.append(f"Agent: {agent_name}\n")
+        parts.append("\n")
         
         # Формируем JSON структуру запроса, как она реально отправляется в API
         request_data = {}
@@ -143,61 +342,61 @@ class LLMRequestLogger:
         # Инструкция
         if instruction:
             request_data['instruction'] = instruction
-            log_entry += f"--- INSTRUCTION ---\n{instruction}\n\n"
-        
-        # Инструменты - извлекаем реальную JSON схему
-        if tools:
-            log_entry += f"--- TOOLS (JSON SCHEMA SENT TO API) ---\n"
+            parts.append(f"--- INSTRUCTION ---\n{instruction}\n\n")
+        
+        # Один и тот же набор инструментов отправляется в каждом запросе агента:
+        # полная схема пишется один раз, дальше - ссылка на запрос, где она записана
+        tools_fingerprint = _tools_fingerprint(tools) if tools else None
+        first_seen = self._tools_seen.get(tools_fingerprint) if tools_fingerprint else None
+        json_note = ""
+        if first_seen is not None:
+            request_id, log_file_name = first_seen
+            parts.append(
+                f"--- TOOLS (unchanged from request {request_id}, {log_file_name}, "
+                f"fingerprint {tools_fingerprint}) ---\n\n"
+            )
+            # В JSON запроса инструменты не подставляются ссылкой - блок помечается как неполный
+            json_note = f"; tools omitted, see request {request_id}, {log_file_name}"
+        elif tools:
+            # Инструменты - извлекаем реальную JSON схему
+            parts.append(f"--- TOOLS (JSON SCHEMA SENT TO API) ---\n")
             tools_schema = []
+            first_error: Optional[Exception] = None
             for tool in tools:
                 try:
-                    # Если это класс Pydantic модели, используем model_json_schema
-                    if hasattr(tool, 'model_json_schema'):
-                        schema = tool.model_json_schema()
-                        tool_json = {
-                            'type': 'function',
-                            'function': {
-                                'name': schema.get('title', tool.__name__),
-                                'description': schema.get('description', ''),
-                                'parameters': {
-                                    'type': 'object',
-                                    'properties': schema.get('properties', {}),
-                                    'required': schema.get('required', [])
-                                }
-                            }
-                        }
-                    else:
-                        # Иначе пытаемся извлечь из SDK объекта
-                        tool_json = self._extract_tool_schema(tool)
-                    
+                    tool_json, tool_text = self._tool_log_entry(tool)
                     tools_schema.append(tool_json)
-                    log_entry += json.dumps(tool_json, ensure_ascii=False, indent=2) + "\n\n"
+                    parts.append(tool_text + "\n\n")
                 except Exception as e:
-                    log_entry += f"Error extracting tool schema: {e}\n"
-                    import traceback
-                    log_entry += f"Traceback: {traceback.format_exc()}\n"
+                    parts.append(f"Error extracting tool schema {tool!r}: {type(e).__name__}: {e}\n")
+                    first_error = first_error or e
+            if first_error is not None:
+                # Трейсбек форматируется один раз - для первой ошибки, а не для каждого инструмента
+                tb_text = ''.join(traceback.format_exception(type(first_error), first_error, first_error.__traceback__))
+                parts.append(f"Traceback: {tb_text}\n")
             request_data['tools'] = tools_schema
+            log_file = self.current_log_file
+            self._tools_seen[tools_fingerprint] = (self._request_counter, log_file.name if log_file else "-")
         
         # Сообщения из thread - извлекаем реальный формат
         if messages:
-            log_entry += f"--- MESSAGES (EXACT FORMAT SENT TO API) ---\n"
-            log_entry += f"Total messages: {len(messages)}\n\n"
+            parts.append(f"--- MESSAGES (EXACT FORMAT SENT TO API) ---\n")
+            parts.append(f"Total messages: {len(messages)}\n\n")
             messages_data = []
             for i, msg in enumerate(messages):
                 try:
-                    msg_json = self._extract_message_data(msg)
-                    messages_data.append(msg_json)
-                    log_entry += f"Message {i+1}:\n"
-                    log_entry += json.dumps(msg_json, ensure_ascii=False, indent=2) + "\n\n"
+                    messages_data.append(self._extract_message_data(msg))
                 except Exception as e:
-                    log_entry += f"Error extracting message {i+1}: {e}\n"
+                    parts.append(f"Error extracting message {i+1}: {e}\n")
+            # Все сообщения сериализуются одним вызовом в единый JSON массив
+            parts.append(_dumps(messages_data) + "\n\n")
             request_data['messages'] = messages_data
         
         # Полный JSON запроса
-        log_entry += f"--- FULL REQUEST JSON (AS SENT TO API) ---\n"
-        log_entry += json.dumps(request_data, ensure_ascii=False, indent=2) + "\n"
+        parts.append(f"--- FULL REQUEST JSON (AS SENT TO API{json_note}) ---\n")
+        parts.append(_dumps(request_data) + "\n")
         
-        self._write_raw(log_entry)
+        self._write_raw(''.join(parts))
     
     def log_response_from_llm(
         self,
@@ -215,11 +414,14 @@ class LLMRequestLogger:
             tool_calls: Список вызовов инструментов
             raw_response: Сырой объект ответа
         """
-        timestamp = datetime.now().isoformat()
-        log_entry = f"\n{'='*80}\n"
-        log_entry += f"[{timestamp}] RESPONSE FROM LLM (EXACT DATA RECEIVED FROM API)\n"
-        log_entry += f"{'='*80}\n"
-        log_entry += f"Agent: {agent_name}\n\n"
+        if not self.logging_enabled:
+            return
+        
+        timestamp = _now_iso()
+        parts = [f"\n{_SEP}\n"]
+        parts.append(f"[{timestamp}] RESPONSE FROM LLM (EXACT DATA RECEIVED FROM API)\n")
+        parts.append(f"{_SEP}\n")
+        parts.append(f"Agent: {agent_name}\n\n")
         
         response_data = {}
         
@@ -227,38 +429,38 @@ class LLMRequestLogger:
         usage_info = self._extract_usage_info(raw_response)
         if usage_info:
             response_data['usage'] = usage_info
-            log_entry += f"--- TOKEN USAGE (TOKENS USED IN THIS CYCLE) ---\n"
-            log_entry += json.dumps(usage_info, ensure_ascii=False, indent=2) + "\n\n"
+            parts.append(f"--- TOKEN USAGE (TOKENS USED IN THIS CYCLE) ---\n")
+            parts.append(_dumps(usage_info) + "\n\n")
         
         # Текст ответа
         if response_text is not None:
             response_data['text'] = response_text
-            log_entry += f"--- RESPONSE TEXT ---\n{response_text}\n\n"
+            parts.append(f"--- RESPONSE TEXT ---\n{response_text}\n\n")
         
         # Вызовы инструментов
         if tool_calls:
-            log_entry += f"--- TOOL CALLS (EXACT FORMAT FROM API) ---\n"
+            parts.append(f"--- TOOL CALLS (EXACT FORMAT FROM API) ---\n")
             tool_calls_data = []
             for i, tool_call in enumerate(tool_calls):
                 try:
                     tool_call_json = self._extract_tool_call_data(tool_call)
                     tool_calls_data.append(tool_call_json)
-                    log_entry += f"Tool Call {i+1}:\n"
-                    log_entry += json.dumps(tool_call_json, ensure_ascii=False, indent=2) + "\n\n"
+                    parts.append(f"Tool Call {i+1}:\n")
+                    parts.append(_dumps(tool_call_json) + "\n\n")
                 except Exception as e:
-                    log_entry += f"Error extracting tool call {i+1}: {e}\n"
+                    parts.append(f"Error extracting tool call {i+1}: {e}\n")
             response_data['tool_calls'] = tool_calls_data
         
         # Полный необработанный JSON ответа
-        log_entry += f"--- FULL RESPONSE JSON (AS RECEIVED FROM API) ---\n"
+        parts.append(f"--- FULL RESPONSE JSON (AS RECEIVED FROM API) ---\n")
         if raw_response and hasattr(raw_response, '_raw_json'):
             # Сохраняем полный необработанный JSON из ответа API
-            log_entry += json.dumps(raw_response._raw_json, ensure_ascii=False, indent=2) + "\n"
+            parts.append(_dumps(raw_response._raw_json) + "\n")
         else:
             # Если нет полного JSON, сохраняем обработанные данные
-            log_entry += json.dumps(response_data, ensure_ascii=False, indent=2) + "\n"
+            parts.append(_dumps(response_data) + "\n")
         
-        self._write_raw(log_entry)
+        self._write_raw(''.join(parts), flush=True)
     
     def log_tool_results_to_llm(
         self,
@@ -272,16 +474,67 @@ class LLMRequestLogger:
             agent_name: Имя агента
             tool_results: Список результатов инструментов
         """
-        timestamp = datetime.now().isoformat()
-        log_entry = f"\n{'='*80}\n"
-        log_entry += f"[{timestamp}] TOOL RESULTS TO LLM (EXACT DATA SENT TO API)\n"
-        log_entry += f"{'='*80}\n"
-        log_entry += f"Agent: {agent_name}\n\n"
+        if not self.logging_enabled:
+            return
+        
+        timestamp = _now_iso()
+        parts = [f"\n{_SEP}\n"]
+        parts.append(f"[{timestamp}] TOOL RESULTS TO LLM (EXACT DATA SENT TO API)\n")
+        parts.append(f"{_SEP}\n")
+        parts.append(f"Agent: {agent_name}\n\n")
+        
+        parts.append(f"--- TOOL RESULTS (EXACT FORMAT SENT TO API) ---\n")
+        
+        # Результаты инструментов могут быть большими: JSON остаётся в UTF-8 байтах от orjson
+        # и не проходит через decode, склейку строк и повторное кодирование в фоновом потоке
+        self._write_raw(''.join(parts).encode('utf-8') + _dumps_bytes(tool_results) + b"\n")
+    
+    def prepare_tools(self, tools: List[Any]):
+        """
+        Заранее построить схемы инструментов для лога (вызывается при создании агента)
         
-        log_entry += f"--- TOOL RESULTS (EXACT FORMAT SENT TO API) ---\n"
-        log_entry += json.dumps(tool_results, ensure_ascii=False, indent=2, default=str) + "\n"
+        Схемы кэшируются, поэтому первый запрос к LLM не тратит время на их построение.
+        
+        Args:
+            tools: Список инструментов (классы инструментов)
+        """
+        if not self.logging_enabled:
+            return
         
-        self._write_raw(log_entry)
+        for tool in tools:
+            try:
+                self._tool_log_entry(tool)
+            except Exception:
+                # Ошибка будет записана в лог при первом запросе с этим инструментом
+                pass
+    
+    def _tool_log_entry(self, tool: Any) -> Tuple[Dict[str, Any], str]:
+        """Схема инструмента в формате API и её JSON для лога (из кэша)"""
+        # Если это класс Pydantic модели, используем model_json_schema
+        if hasattr(tool, 'model_json_schema'):
+            # model_json_schema - метод класса, поэтому экземпляр кэшируется по своему классу
+            return _tool_schema_entry(tool if isinstance(tool, type) else type(tool))
+        # Иначе пытаемся извлечь из SDK объекта
+        return self._get_tool_schema_entry(tool)
+    
+    def _get_tool_schema_entry(self, tool: Any) -> Tuple[Dict[str, Any], str]:
+        """Схема SDK инструмента и её JSON для лога (кэшируется по типу и имени инструмента)"""
+        try:
+            key = (type(tool), getattr(tool, 'name', None))
+            entry = self._tool_schema_cache.get(key)
+        except TypeError:
+            # Нехэшируемое имя - считаем схему без кэша
+            key = entry = None
+        if entry is not None:
+            return entry
+        
+        tool_json = self._extract_tool_schema(tool)
+        entry = (tool_json, _dumps(tool_json))
+        # Ошибку извлечения не кэшируем: следующий вызов попробует снова.
+        # setdefault атомарен под GIL - параллельный вызов в худшем случае посчитает схему дважды
+        if key is not None and not str(tool_json['function']['name']).startswith("Error extracting tool"):
+            entry = self._tool_schema_cache.setdefault(key, entry)
+        return entry
     
     def _extract_tool_schema(self, tool: Any) -> Dict[str, Any]:
         """Извлечь JSON схему инструмента, как она реально отправляется в API"""
@@ -293,12 +546,14 @@ class LLMRequestLogger:
         try:
             # Сначала проверяем прямые атрибуты объекта (для FunctionTool из SDK)
             # У FunctionTool атрибуты name, description, parameters находятся напрямую
-            if hasattr(tool, 'name'):
-                tool_schema['function']['name'] = tool.name
-            if hasattr(tool, 'description'):
-                tool_schema['function']['description'] = tool.description
-            if hasattr(tool, 'parameters'):
-                params = tool.parameters
+            name = getattr(tool, 'name', _MISSING)
+            if name is not _MISSING:
+                tool_schema['function']['name'] = name
+            description = getattr(tool, 'description', _MISSING)
+            if description is not _MISSING:
+                tool_schema['function']['description'] = description
+            params = getattr(tool, 'parameters', _MISSING)
+            if params is not _MISSING:
                 if isinstance(params, dict):
                     tool_schema['function']['parameters'] = params
                 elif hasattr(params, 'model_dump'):
@@ -324,26 +579,27 @@ class LLMRequestLogger:
                         tool_schema['function']['parameters'] = str(params)
             
             # Если не удалось извлечь через прямые атрибуты, пробуем через function
-            if not tool_schema['function'].get('name') and hasattr(tool, 'function'):
-                func = tool.function
-                
+            func = _MISSING if tool_schema['function'].get('name') else getattr(tool, 'function', _MISSING)
+            if func is not _MISSING:
                 # Имя функции
-                if hasattr(func, 'name'):
-                    tool_schema['function']['name'] = func.name
+                func_name = getattr(func, 'name', _MISSING)
+                if func_name is not _MISSING:
+                    tool_schema['function']['name'] = func_name
                 elif isinstance(func, dict) and 'name' in func:
                     tool_schema['function']['name'] = func['name']
                 
                 # Описание функции
                 if not tool_schema['function'].get('description'):
-                    if hasattr(func, 'description'):
-                        tool_schema['function']['description'] = func.description
+                    func_description = getattr(func, 'description', _MISSING)
+                    if func_description is not _MISSING:
+                        tool_schema['function']['description'] = func_description
                     elif isinstance(func, dict) and 'description' in func:
                         tool_schema['function']['description'] = func['description']
                 
                 # Параметры функции
                 if not tool_schema['function'].get('parameters'):
-                    if hasattr(func, 'parameters'):
-                        params = func.parameters
+                    params = getattr(func, 'parameters', _MISSING)
+                    if params is not _MISSING:
                         if isinstance(params, dict):
                             tool_schema['function']['parameters'] = params
                         elif hasattr(params, 'model_dump'):
@@ -372,7 +628,7 @@ class LLMRequestLogger:
                     model = getattr(tool, '_model', None) or getattr(tool, '_pydantic_model', None)
                     if model:
                         try:
-                            schema = model.model_json_schema()
+                            schema = _model_json_schema(model)
                             if not tool_schema['function'].get('name'):
                                 tool_schema['function']['name'] = schema.get('title', model.__name__)
                             if not tool_schema['function'].get('description'):
@@ -423,21 +679,14 @@ class LLMRequestLogger:
         message_data = {}
         
         # Роль
-        role = None
-        if hasattr(msg, 'author') and hasattr(msg.author, 'role'):
-            role = msg.author.role
-        elif hasattr(msg, 'role'):
-            role = msg.role
+        role = getattr(getattr(msg, 'author', None), 'role', _MISSING)
+        if role is _MISSING:
+            role = getattr(msg, 'role', None)
         
         if role:
             # Нормализуем роль
-            role_lower = str(role).lower()
-            if role_lower in ['user']:
-                message_data['role'] = 'user'
-            elif role_lower in ['assistant', 'model']:
-                message_data['role'] = 'assistant'
-            else:
-                message_data['role'] = str(role)
+            role_text = str(role)
+            message_data['role'] = _ROLE_MAP.get(role_text.lower(), role_text)
         
         # Содержимое
         content = None
@@ -474,20 +723,7 @@ class LLMRequestLogger:
         
         usage_info = {}
         
-        # Проверяем различные возможные атрибуты для информации о токенах
-        possible_attrs = [
-            'usage',
-            'usage_tokens',
-            'tokens',
-            'token_usage',
-            'input_tokens',
-            'output_tokens',
-            'total_tokens',
-            'prompt_tokens',
-            'completion_tokens'
-        ]
-        
-        for attr in possible_attrs:
+        for attr in _usage_attrs(raw_response):
             try:
                 value = getattr(raw_response, attr, None)
                 if value is not None:
@@ -497,36 +733,11 @@ class LLMRequestLogger:
                             k: v for k, v in value.__dict__.items() 
                             if not k.startswith('_')
                         }
-                    elif isinstance(value, dict):
-                        usage_info[attr] = value
                     else:
                         usage_info[attr] = value
             except Exception:
                 pass
         
-        # Также проверяем через dir() все атрибуты, связанные с токенами
-        try:
-            attrs = [attr for attr in dir(raw_response) if not attr.startswith('_')]
-            for attr in attrs:
-                attr_lower = attr.lower()
-                if 'token' in attr_lower or 'usage' in attr_lower:
-                    try:
-                        value = getattr(raw_response, attr)
-                        if value is not None and attr not in usage_info:
-                            if hasattr(value, '__dict__'):
-                                usage_info[attr] = {
-                                    k: v for k, v in value.__dict__.items() 
-                                    if not k.startswith('_')
-                                }
-                            elif isinstance(value, dict):
-                                usage_info[attr] = value
-                            else:
-                                usage_info[attr] = value
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-        
         return usage_info if usage_info else None
     
     def _extract_tool_call_data(self, tool_call: Any) -> Dict[str, Any]:
@@ -569,20 +780,41 @@ class LLMRequestLogger:
     
     def log_error(self, agent_name: str, error: Exception, context: Optional[str] = None):
         """Логировать ошибку"""
-        timestamp = datetime.now().isoformat()
-        log_entry = f"\n{'='*80}\n"
-        log_entry += f"[{timestamp}] ERROR\n"
-        log_entry += f"{'='*80}\n"
-        log_entry += f"Agent: {agent_name}\n"
+        if not self.logging_enabled:
+            return
+        
+        timestamp = _now_iso()
+        parts = [f"\n{_SEP}\n"]
+        parts.append(f"[{timestamp}] ERROR\n")
+        parts.append(f"{_SEP}\n")
+        parts.append(f"Agent: {agent_name}\n")
         if context:
-            log_entry += f"Context: {context}\n"
-        log_entry += f"Error Type: {type(error).__name__}\n"
-        log_entry += f"Error Message: {str(error)}\n"
-        import traceback
-        log_entry += f"\n--- TRACEBACK ---\n{traceback.format_exc()}\n"
-        self._write_raw(log_entry)
+            parts.append(f"Context: {context}\n")
+        parts.append(f"Error Type: {type(error).__name__}\n")
+        parts.append(f"Error Message: {str(error)}\n")
+        if isinstance(error, LOG_NO_TRACEBACK_TYPES):
+            # Ожидаемые ошибки (валидация, отсутствующие ключи) - без обхода стека
+            tb_text = f"{type(error).__name__}: {error}\n"
+        else:
+            # Трейсбек берётся из самого исключения, а не из sys.exc_info() текущего контекста
+            tb_text = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+        parts.append(f"\n--- TRACEBACK ---\n{tb_text}\n")
+        self._write_raw(''.join(parts), flush=True)
 
 
+LLMRequestLogger._instance = object.__new__(LLMRequestLogger)
+LLMRequestLogger._instance._initialized = False
+
 # Глобальный экземпляр логгера
 llm_request_logger = LLMRequestLogger()
 
+
+@lru_cache(maxsize=1)
+def get_logger() -> LLMRequestLogger:
+    """Получить глобальный экземпляр логгера запросов LLM"""
+    return llm_request_logger
+
+
+# Включено ли логирование: вызывающий код может не собирать данные для лога, если оно выключено
+LOGGING_ENABLED = llm_request_logger.logging_enabled
+
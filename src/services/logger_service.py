@@ -5,7 +5,11 @@ import os
 import sys
 import traceback
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+
+
+# Уровни логирования (по возрастанию важности)
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "SUCCESS": 20, "WARNING": 30, "ERROR": 40}
 
 
 class Colors:
@@ -39,6 +43,48 @@ class Logger:
     def __init__(self, name: str = "Bot"):
         self.name = name
         self.enable_colors = self._should_enable_colors()
+        # Уровень пересчитывается только при изменении DEBUG/LOG_LEVEL: логгер импортируется
+        # раньше, чем load_dotenv() загружает .env, поэтому читать окружение один раз нельзя
+        self._level_env: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._level = LOG_LEVELS["INFO"]
+    
+    @property
+    def level(self) -> int:
+        """Минимальный уровень логирования (по текущим DEBUG и LOG_LEVEL)"""
+        level_env = (os.environ.get("DEBUG"), os.environ.get("LOG_LEVEL"))
+        if level_env != self._level_env:
+            self._level = self._resolve_level(*level_env)
+            self._level_env = level_env
+        return self._level
+    
+    @staticmethod
+    def _resolve_level(debug: Optional[str], log_level: Optional[str]) -> int:
+        """Определяет минимальный уровень логирования из LOG_LEVEL (DEBUG=true включает отладку)"""
+        if (debug or "false").lower() == "true":
+            return LOG_LEVELS["DEBUG"]
+        return LOG_LEVELS.get((log_level or "INFO").upper(), LOG_LEVELS["INFO"])
+    
+    def is_enabled_for(self, level: str) -> bool:
+        """Проверяет, будет ли выведено сообщение указанного уровня"""
+        return LOG_LEVELS[level] >= self.level
+    
+    @staticmethod
+    def _split_args(message: str, args: tuple) -> Tuple[str, Optional[str]]:
+        """
+        Разбирает позиционные аргументы сообщения
+        
+        Поддерживаются оба варианта вызова:
+        - logger.info("Сообщение", details) - details выводится в скобках
+        - logger.info("Сообщение: %s", value) - ленивое %-форматирование
+        """
+        if not args:
+            return message, None
+        if "%" in message:
+            try:
+                return message % args, None
+            except (TypeError, ValueError):
+                pass
+        return message, args[0]
     
     def _should_enable_colors(self) -> bool:
         """Проверяет, поддерживает ли терминал цвета"""
@@ -75,29 +121,32 @@ class Logger:
         output_stream = sys.stderr if use_stderr else sys.stdout
         print(main_msg, file=output_stream, flush=True)
     
-    def info(self, message: str, details: Optional[str] = None):
+    def info(self, message: str, *args):
         """Информационное сообщение"""
-        self._log("INFO", "ℹ️", Colors.BLUE, message, details)
+        if self.is_enabled_for("INFO"):
+            self._log("INFO", "ℹ️", Colors.BLUE, *self._split_args(message, args))
     
-    def success(self, message: str, details: Optional[str] = None):
+    def success(self, message: str, *args):
         """Сообщение об успехе"""
-        self._log("SUCCESS", "✅", Colors.GREEN, message, details)
+        if self.is_enabled_for("SUCCESS"):
+            self._log("SUCCESS", "✅", Colors.GREEN, *self._split_args(message, args))
     
-    def warning(self, message: str, details: Optional[str] = None):
+    def warning(self, message: str, *args):
         """Предупреждение"""
-        self._log("WARNING", "⚠️", Colors.YELLOW, message, details, use_stderr=True)
+        if self.is_enabled_for("WARNING"):
+            self._log("WARNING", "⚠️", Colors.YELLOW, *self._split_args(message, args), use_stderr=True)
     
-    def error(self, message: str, details: Optional[str] = None, exc_info: bool = False):
+    def error(self, message: str, *args, exc_info: bool = False):
         """Ошибка - выводится в stderr для гарантированной видимости"""
-        self._log("ERROR", "❌", Colors.RED, message, details, use_stderr=True)
+        self._log("ERROR", "❌", Colors.RED, *self._split_args(message, args), use_stderr=True)
         if exc_info:
             # Выводим traceback в stderr
             traceback.print_exc(file=sys.stderr)
     
-    def debug(self, message: str, details: Optional[str] = None):
-        """Отладочное сообщение (только если включен DEBUG режим)"""
-        if os.getenv("DEBUG", "false").lower() == "true":
-            self._log("DEBUG", "🐛", Colors.MAGENTA, message, details)
+    def debug(self, message: str, *args):
+        """Отладочное сообщение (только если включен DEBUG режим или LOG_LEVEL=DEBUG)"""
+        if self.is_enabled_for("DEBUG"):
+            self._log("DEBUG", "🐛", Colors.MAGENTA, *self._split_args(message, args))
     
     def telegram(self, action: str, chat_id: Optional[str] = None):
         """Логирование действий Telegram бота"""
@@ -0,0 +1,126 @@
+"""
+Сервис для форматирования ответа за один проход по тексту
+"""
+import re
+from functools import partial
+
+from .date_normalizer import DateNormalizer
+from .time_normalizer import TimeNormalizer
+from .link_converter import LinkConverter
+from .text_formatter import TextFormatter
+
+
+def _build_combined_pattern(include_bold: bool) -> "re.Pattern[str]":
+    """Собирает паттерны всех преобразований в одну альтернацию с именованными группами"""
+    parts = [
+        "(?P<date>" + "|".join(f"(?:{pattern})" for pattern in DateNormalizer.PATTERNS) + ")",
+        f"(?P<time>{TimeNormalizer.PATTERN})",
+        f"(?P<link>{LinkConverter.PATTERN})",
+    ]
+    if include_bold:
+        parts.append(f"(?P<bold>{TextFormatter.BOLD_PATTERN})")
+    return re.compile("|".join(parts))
+
+
+# Даты и время всегда содержат цифры
+_DIGIT_RE = re.compile(r"\d")
+
+
+def _needs_formatting(text: str, include_bold: bool) -> bool:
+    """Быстрая проверка подстрок: есть ли в тексте что-то для regex-прохода"""
+    if "yclients.com" in text or (include_bold and "**" in text):
+        return True
+    return _DIGIT_RE.search(text) is not None
+
+
+class ReplyFormatter:
+    """
+    Объединяет нормализацию дат, времени, ссылок yclients.com и жирного текста
+    в один проход регулярного выражения вместо четырёх последовательных.
+    
+    Каждое совпадение передаётся в исходный сервис, поэтому правила
+    форматирования остаются в date_normalizer, time_normalizer,
+    link_converter и text_formatter.
+    """
+    
+    _NORMALIZE_RE = _build_combined_pattern(include_bold=False)
+    _FORMAT_RE = _build_combined_pattern(include_bold=True)
+    
+    @staticmethod
+    def _replace(match: "re.Match[str]", anchor_spans) -> str:
+        """Обработка совпадения по имени сработавшей группы (anchor_spans - теги <a> исходного текста)"""
+        kind = match.lastgroup
+        matched = match.group(0)
+        
+        if kind == "date":
+            return DateNormalizer.normalize_dates(matched)
+        if kind == "time":
+            return TimeNormalizer.normalize_times(matched)
+        if kind == "link":
+            # Ссылку внутри уже созданного тега <a> не трогаем
+            if LinkConverter.is_inside_spans(anchor_spans, match.start()):
+                return matched
+            return LinkConverter.convert_yclients_links(matched)
+        if kind == "bold":
+            # Содержимое жирного текста тоже форматируем (даты, время, ссылки)
+            return f"<b>{ReplyFormatter.format_reply(matched[2:-2])}</b>"
+        return matched
+    
+    @staticmethod
+    def normalize_reply(text: str) -> str:
+        """
+        Нормализует даты, время и ссылки yclients.com в тексте за один проход
+        
+        Args:
+            text: Текст ответа
+            
+        Returns:
+            Текст с нормализованными датами, временем и ссылками
+        """
+        if not text or not _needs_formatting(text, include_bold=False):
+            return text
+        replace = partial(ReplyFormatter._replace, anchor_spans=LinkConverter.find_anchor_spans(text))
+        return ReplyFormatter._NORMALIZE_RE.sub(replace, text)
+    
+    @staticmethod
+    def format_reply(text: str) -> str:
+        """
+        Нормализует даты, время, ссылки yclients.com и заменяет **текст** на <b>текст</b>
+        за один проход
+        
+        Args:
+            text: Текст ответа
+            
+        Returns:
+            Текст, готовый к отправке с parse_mode=HTML
+        """
+        if not text or not _needs_formatting(text, include_bold=True):
+            return text
+        replace = partial(ReplyFormatter._replace, anchor_spans=LinkConverter.find_anchor_spans(text))
+        return ReplyFormatter._FORMAT_RE.sub(replace, text)
+
+
+def normalize_reply_text(text: str) -> str:
+    """
+    Удобная функция для нормализации дат, времени и ссылок в тексте
+    
+    Args:
+        text: Текст ответа
+    
+    Returns:
+        Нормализованный текст
+    """
+    return ReplyFormatter.normalize_reply(text)
+
+
+def format_reply_text(text: str) -> str:
+    """
+    Удобная функция для полного форматирования ответа перед отправкой в Telegram
+    
+    Args:
+        text: Текст ответа
+    
+    Returns:
+        Текст, готовый к отправке с parse_mode=HTML
+    """
+    return ReplyFormatter.format_reply(text)
@@ -2,7 +2,10 @@
 Клиент для работы с Responses API Yandex Cloud
 """
 import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Any, Optional
 from .config import ResponsesAPIConfig
 from ..logger_service import logger
@@ -16,6 +19,24 @@ class ResponsesAPIClient:
         self.base_url = self.config.base_url
         self.api_key = self.config.api_key
         self.project = self.config.project
+        
+        # Заголовки и URL не меняются между запросами - собираем их один раз
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "x-folder-id": self.project,
+            "Content-Type": "application/json"
+        }
+        self._responses_url = f"{self.base_url}/responses"
+        
+        # Постоянная HTTP-сессия: TCP и TLS соединение переиспользуется между итерациями оркестратора.
+        # Повторяются только ошибки соединения - запрос до сервера не дошёл, повтор POST безопасен
+        self._session = requests.Session()
+        self._session.headers.update(self._headers)
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.2),
+        ))
     
     def create_response(
         self,
@@ -41,17 +62,11 @@ class ResponsesAPIClient:
             Ответ от Responses API (объект с атрибутами id, output_text и output)
         """
         try:
-            url = f"{self.base_url}/responses"
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "x-folder-id": self.project,
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "model": self.config.model_uri,
                 "instructions": instructions,
+                "max_output_tokens": self.config.max_output_tokens if max_output_tokens is None else max_output_tokens,
+                "temperature": self.config.temperature if temperature is None else temperature,
             }
             
             # Используем previous_response_id для продолжения диалога (если есть)
@@ -65,17 +80,13 @@ class ResponsesAPIClient:
             if tools:
                 payload["tools"] = tools
             
-            if max_output_tokens is not None:
-                payload["max_output_tokens"] = max_output_tokens
-            else:
-                payload["max_output_tokens"] = self.config.max_output_tokens
-            
-            if temperature is not None:
-                payload["temperature"] = temperature
-            else:
-                payload["temperature"] = self.config.temperature
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=120)
+            # Сериализуем тело через orjson - заголовки (включая Content-Type) уже заданы в сессии.
+            # Таймауты: 5 секунд на соединение, 120 секунд на ответ модели
+            response = self._session.post(
+                self._responses_url,
+                data=orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
+                timeout=(5, 120),
+            )
             response.raise_for_status()
             
             result = response.json()
@@ -2,12 +2,22 @@
 Orchestrator для обработки диалогов через Responses API
 """
 import json
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from .client import ResponsesAPIClient
 from .tools_registry import ResponsesToolsRegistry
 from .config import ResponsesAPIConfig
 from ..logger_service import logger
 
+# Максимальное количество инструментов одной итерации, выполняемых параллельно
+TOOL_CALL_MAX_WORKERS = 8
+
+# Общий пул потоков для инструментов: большинство из них ждут БД или CRM
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_CALL_MAX_WORKERS, thread_name_prefix="tool-call")
+
+# Инструменты, которые завершают ход (эскалация): не выполняются параллельно с другими
+TURN_ENDING_TOOLS = frozenset({"CallManager"})
+
 # Импортируем CallManagerException один раз, а не в цикле
 try:
     from ...agents.tools.call_manager_tools import CallManagerException
@@ -137,65 +147,46 @@ class ResponsesOrchestrator:
             
             logger.debug(f"Найдено {len(tool_calls)} вызовов инструментов на итерации {iteration}")
             
-            # Выполняем инструменты
-            for call in tool_calls:
-                func_name = call.get("name")
-                call_id = call.get("call_id", "")
-                args_json = call.get("arguments", "{}")
-                
-                try:
-                    args = json.loads(args_json) if isinstance(args_json, str) else args_json
-                except json.JSONDecodeError:
-                    logger.error(f"Ошибка парсинга аргументов для {func_name}: {args_json}")
-                    args = {}
+            # Выполняем инструменты; результаты собираются в исходном порядке call_id
+            prepared_calls = [self._prepare_tool_call(call) for call in tool_calls]
+            outcomes = self._run_tool_calls(prepared_calls, chat_id)
+            
+            escalation = None
+            for (func_name, call_id, args), outcome in zip(prepared_calls, outcomes):
+                if outcome is None:
+                    # Вызов не выполнялся: ход завершается эскалацией из другого вызова
+                    continue
+                result, call_manager_error = outcome
+                if call_manager_error is not None:
+                    # Запоминаем первую эскалацию; выполненные инструменты пакета
+                    # всё равно попадают в tool_calls
+                    if escalation is None:
+                        escalation = (func_name, call_manager_error)
+                    continue
                 
-                # Логируем использование инструмента
-                logger.info(f"🔧 Использован инструмент: {func_name}")
-                logger.info(f"📋 Аргументы: {json.dumps(args, ensure_ascii=False, indent=2)}")
+                # Сохраняем информацию о вызове инструмента (или об ошибке)
+                tool_call_info = {
+                    "name": func_name,
+                    "call_id": call_id,
+                    "args": args,
+                    "result": result,
+                }
+                tool_calls_info.append(tool_call_info)
+                last_iteration_tool_calls.append(tool_call_info)
+            
+            if escalation is not None:
+                # CallManager был вызван - возвращаем специальный результат
+                func_name, call_manager_error = escalation
+                escalation_result = call_manager_error.escalation_result
+                logger.info(f"CallManager вызван через инструмент {func_name}")
                 
-                # Вызываем инструмент
-                try:
-                    # Передаём None для conversation_history, так как Responses API сам управляет историей
-                    result = self.tools_registry.call_tool(func_name, args, conversation_history=None, chat_id=chat_id)
-                    
-                    # Сохраняем информацию о вызове инструмента
-                    tool_call_info = {
-                        "name": func_name,
-                        "call_id": call_id,
-                        "args": args,
-                        "result": result,
-                    }
-                    tool_calls_info.append(tool_call_info)
-                    last_iteration_tool_calls.append(tool_call_info)
-                    
-                except Exception as e:
-                    # Проверяем, не является ли это CallManagerException
-                    if CallManagerException and isinstance(e, CallManagerException):
-                        # CallManager был вызван - возвращаем специальный результат
-                        escalation_result = e.escalation_result
-                        logger.info(f"CallManager вызван через инструмент {func_name}")
-                        
-                        return {
-                            "reply": escalation_result.get("user_message"),
-                            "response_id": final_response_id,
-                            "tool_calls": tool_calls_info,
-                            "call_manager": True,
-                            "manager_alert": escalation_result.get("manager_alert"),
-                        }
-                    
-                    # Обрабатываем ошибку инструмента
-                    logger.error(f"Ошибка при вызове инструмента {func_name}: {e}", exc_info=True)
-                    error_result = f"Ошибка при выполнении инструмента: {str(e)}"
-                    
-                    # Сохраняем информацию об ошибке
-                    tool_call_info = {
-                        "name": func_name,
-                        "call_id": call_id,
-                        "args": args,
-                        "result": error_result,
-                    }
-                    tool_calls_info.append(tool_call_info)
-                    last_iteration_tool_calls.append(tool_call_info)
+                return {
+                    "reply": escalation_result.get("user_message"),
+                    "response_id": final_response_id,
+                    "tool_calls": tool_calls_info,
+                    "call_manager": True,
+                    "manager_alert": escalation_result.get("manager_alert"),
+                }
         
         if iteration >= max_iterations:
             logger.warning(f"Достигнут лимит итераций ({max_iterations}). Прекращаем цикл.")
@@ -212,6 +203,99 @@ class ResponsesOrchestrator:
             "raw_response": last_raw_response if 'last_raw_response' in locals() else None,
         }
     
+    def _prepare_tool_call(self, call: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Разбор вызова инструмента из ответа API
+        
+        Args:
+            call: Вызов инструмента (name, call_id, arguments)
+            
+        Returns:
+            Кортеж (имя инструмента, call_id, аргументы)
+        """
+        func_name = call.get("name")
+        call_id = call.get("call_id", "")
+        args_json = call.get("arguments", "{}")
+        
+        try:
+            args = json.loads(args_json) if isinstance(args_json, str) else args_json
+        except json.JSONDecodeError:
+            logger.error(f"Ошибка парсинга аргументов для {func_name}: {args_json}")
+            args = {}
+        
+        # Логируем использование инструмента
+        logger.info(f"🔧 Использован инструмент: {func_name}")
+        logger.info(f"📋 Аргументы: {json.dumps(args, ensure_ascii=False, indent=2)}")
+        
+        return func_name, call_id, args
+    
+    def _run_tool_calls(
+        self,
+        prepared_calls: List[Tuple[str, str, Dict[str, Any]]],
+        chat_id: Optional[str],
+    ) -> List[Optional[Tuple[Any, Optional[Exception]]]]:
+        """
+        Выполнение вызовов инструментов одной итерации
+        
+        Независимые инструменты выполняются параллельно. Инструменты, завершающие ход
+        (TURN_ENDING_TOOLS), выполняются после них по одному и только до первой эскалации,
+        чтобы менеджер не получил повторное уведомление.
+        
+        Args:
+            prepared_calls: Результаты _prepare_tool_call
+            chat_id: ID чата в Telegram (для передачи в инструменты)
+            
+        Returns:
+            Результаты _invoke_tool в порядке вызовов (None - вызов не выполнялся из-за эскалации)
+        """
+        outcomes: List[Optional[Tuple[Any, Optional[Exception]]]] = [None] * len(prepared_calls)
+        
+        parallel = [i for i, (func_name, _, _) in enumerate(prepared_calls) if func_name not in TURN_ENDING_TOOLS]
+        if len(parallel) > 1:
+            parallel_outcomes = _tool_executor.map(
+                lambda i: self._invoke_tool(prepared_calls[i][0], prepared_calls[i][2], chat_id),
+                parallel,
+            )
+            for i, outcome in zip(parallel, parallel_outcomes):
+                outcomes[i] = outcome
+        else:
+            for i in parallel:
+                outcomes[i] = self._invoke_tool(prepared_calls[i][0], prepared_calls[i][2], chat_id)
+        
+        escalated = any(outcome[1] is not None for outcome in outcomes if outcome is not None)
+        for i, (func_name, _, args) in enumerate(prepared_calls):
+            if escalated:
+                break
+            if outcomes[i] is None:
+                outcomes[i] = self._invoke_tool(func_name, args, chat_id)
+                escalated = outcomes[i][1] is not None
+        
+        return outcomes
+    
+    def _invoke_tool(self, func_name: str, args: Dict[str, Any], chat_id: Optional[str]) -> Tuple[Any, Optional[Exception]]:
+        """
+        Вызов инструмента (может выполняться в пуле потоков)
+        
+        Args:
+            func_name: Имя инструмента
+            args: Аргументы инструмента
+            chat_id: ID чата в Telegram (для передачи в инструменты)
+            
+        Returns:
+            Кортеж (результат, CallManagerException или None); ошибка инструмента возвращается как результат
+        """
+        try:
+            # Передаём None для conversation_history, так как Responses API сам управляет историей
+            return self.tools_registry.call_tool(func_name, args, conversation_history=None, chat_id=chat_id), None
+        except Exception as e:
+            # Проверяем, не является ли это CallManagerException
+            if CallManagerException and isinstance(e, CallManagerException):
+                return None, e
+            
+            # Обрабатываем ошибку инструмента
+            logger.error(f"Ошибка при вызове инструмента {func_name}: {e}", exc_info=True)
+            return f"Ошибка при выполнении инструмента: {str(e)}", None
+    
     def _extract_tool_calls(self, response: Any) -> List[Dict[str, Any]]:
         """
         Извлечение tool_calls из ответа Responses API
@@ -6,6 +6,12 @@ from typing import Dict, Callable, Any, List, Optional
 from pydantic import BaseModel
 from ..logger_service import logger
 
+# Импортируем CallManagerException один раз, а не при каждой ошибке инструмента
+try:
+    from ...agents.tools.call_manager_tools import CallManagerException
+except ImportError:
+    CallManagerException = None
+
 
 class ResponsesToolsRegistry:
     """Регистрация и управление инструментами для Responses API"""
@@ -81,8 +87,7 @@ class ResponsesToolsRegistry:
                 return result
             except Exception as e:
                 # Пробрасываем CallManagerException дальше
-                from ...agents.tools.call_manager_tools import CallManagerException
-                if isinstance(e, CallManagerException):
+                if CallManagerException and isinstance(e, CallManagerException):
                     raise
                 
                 logger.error(f"Ошибка при вызове инструмента {tool_name}: {e}", exc_info=True)
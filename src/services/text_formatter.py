@@ -4,6 +4,10 @@ import re
 class TextFormatter:
     """Сервис для форматирования текста: замена Markdown на HTML"""
     
+    # Паттерн для поиска **текст** (жирный текст в Markdown)
+    # Используем non-greedy match, чтобы не захватывать лишние звездочки
+    BOLD_PATTERN = r'\*\*(.+?)\*\*'
+    
     @staticmethod
     def convert_bold_markdown_to_html(text: str) -> str:
         """
@@ -15,20 +19,16 @@ class TextFormatter:
         Returns:
             Текст с HTML тегами вместо Markdown
         """
-        if not text:
+        if not text or "**" not in text:
             return text
         
-        # Паттерн для поиска **текст** (жирный текст в Markdown)
-        # Используем non-greedy match, чтобы не захватывать лишние звездочки
-        pattern = r'\*\*(.+?)\*\*'
-        
         def replace_bold(match):
             # Извлекаем текст между звездочками
             content = match.group(1)
             # Заменяем на HTML тег <b>
             return f'<b>{content}</b>'
         
-        result = re.sub(pattern, replace_bold, text)
+        result = re.sub(TextFormatter.BOLD_PATTERN, replace_bold, text)
         
         return result
 
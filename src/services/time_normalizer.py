@@ -5,6 +5,10 @@ from typing import Optional
 class TimeNormalizer:
     """Сервис для нормализации времени в тексте"""
     
+    # Паттерн для времени с пробелами вокруг двоеточия или без них
+    # Ищем: одна или две цифры, возможные пробелы, двоеточие, возможные пробелы, две цифры
+    PATTERN = r'(\d{1,2})\s*:\s*(\d{2})'
+    
     @staticmethod
     def normalize_times(text: str) -> str:
         """
@@ -18,13 +22,10 @@ class TimeNormalizer:
         - 9 :00 -> 09:00
         - 9: 00 -> 09:00
         """
-        if not text:
+        # Без двоеточия время в тексте не встречается
+        if not text or ":" not in text:
             return text
         
-        # Паттерн для времени с пробелами вокруг двоеточия или без них
-        # Ищем: одна или две цифры, возможные пробелы, двоеточие, возможные пробелы, две цифры
-        pattern = r'(\d{1,2})\s*:\s*(\d{2})'
-        
         def format_time(match):
             hours = int(match.group(1))
             minutes = int(match.group(2))
@@ -36,7 +37,7 @@ class TimeNormalizer:
             # Если время невалидно, возвращаем исходное
             return match.group(0)
         
-        result = re.sub(pattern, format_time, text)
+        result = re.sub(TimeNormalizer.PATTERN, format_time, text)
         
         return result
 
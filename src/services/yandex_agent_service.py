@@ -12,13 +12,19 @@ from .auth_service import AuthService
 from .debug_service import DebugService
 from .logger_service import logger
 from ..graph.main_graph import MainGraph
+from ..graph.conversation_state import ConversationState
 from .langgraph_service import LangGraphService
+from .reply_formatter import normalize_reply_text
+from .tool_history_service import get_tool_history_service
 import requests
 
 
 class YandexAgentService:
     """Сервис для работы с LangGraph (Responses API)"""
     
+    # URL для получения точного московского времени
+    MOSCOW_TIME_URL = 'http://worldtimeapi.org/api/timezone/Europe/Moscow'
+    
     def __init__(self, auth_service: AuthService, debug_service: DebugService):
         """Инициализация сервиса с внедрением зависимостей"""
         self.auth_service = auth_service
@@ -60,7 +66,7 @@ class YandexAgentService:
         try:
             # Получаем точное время через WorldTimeAPI
             response = requests.get(
-                'http://worldtimeapi.org/api/timezone/Europe/Moscow',
+                self.MOSCOW_TIME_URL,
                 timeout=2
             )
             response.raise_for_status()
@@ -96,8 +102,6 @@ class YandexAgentService:
     
     async def send_to_agent_langgraph(self, chat_id: str, user_text: str) -> dict:
         """Отправка сообщения через LangGraph (Responses API)"""
-        from ..graph.conversation_state import ConversationState
-        
         # Получаем last_response_id для продолжения диалога
         last_response_id = await asyncio.to_thread(
             self.ydb_client.get_last_response_id,
@@ -119,11 +123,9 @@ class YandexAgentService:
             "manager_alert": None
         }
         
-        # Выполняем граф
-        result_state = await asyncio.to_thread(
-            self.main_graph.compiled_graph.invoke,
-            initial_state
-        )
+        # Выполняем граф асинхронно: узлы сами выносят запросы к LLM в потоки,
+        # а event loop в это время обслуживает другие обновления
+        result_state = await self.main_graph.compiled_graph.ainvoke(initial_state)
         
         # Сохраняем response_id для следующего запроса
         response_id = result_state.get("response_id")
@@ -138,20 +140,12 @@ class YandexAgentService:
         answer = result_state.get("answer", "")
         manager_alert = result_state.get("manager_alert")
         
-        # Нормализуем даты и время в ответе
-        from .date_normalizer import normalize_dates_in_text
-        from .time_normalizer import normalize_times_in_text
-        from .link_converter import convert_yclients_links_in_text
-        
-        answer = normalize_dates_in_text(answer)
-        answer = normalize_times_in_text(answer)
-        answer = convert_yclients_links_in_text(answer)
+        # Нормализуем даты, время и ссылки в ответе за один проход
+        answer = normalize_reply_text(answer)
         
         result = {"user_message": answer}
         if manager_alert:
-            manager_alert = normalize_dates_in_text(manager_alert)
-            manager_alert = normalize_times_in_text(manager_alert)
-            manager_alert = convert_yclients_links_in_text(manager_alert)
+            manager_alert = normalize_reply_text(manager_alert)
             result["manager_alert"] = manager_alert
         
         return result
@@ -171,7 +165,6 @@ class YandexAgentService:
             
             # Очищаем историю результатов инструментов
             try:
-                from .tool_history_service import get_tool_history_service
                 tool_history_service = get_tool_history_service()
                 tool_history_service.clear_history(chat_id)
                 logger.debug(f"История результатов инструментов очищена для chat_id={chat_id}")
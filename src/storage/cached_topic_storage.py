@@ -0,0 +1,140 @@
+"""Кэширующая обёртка над хранилищем топиков."""
+
+import logging
+import time
+from collections import OrderedDict
+
+from src.storage.topic_storage import BaseTopicStorage
+
+logger = logging.getLogger(__name__)
+
+
+class CachedTopicStorage(BaseTopicStorage):
+    """
+    Хранилище топиков с кэшем в памяти процесса поверх другого хранилища.
+    
+    - Связи user_id <-> topic_id после создания топика не меняются,
+      поэтому хранятся в LRU-кэше без срока жизни.
+    - Режим работы может переключить другой экземпляр контейнера,
+      поэтому в памяти держится снимок множества пользователей в ручном
+      режиме, который перечитывается раз в короткий TTL и обновляется при set_mode.
+      Ручной режим редок, так что проверка режима на каждом сообщении
+      сводится к проверке вхождения в множество.
+    """
+
+    def __init__(
+        self,
+        storage: BaseTopicStorage,
+        maxsize: int = 10_000,
+        mode_ttl: float = 5.0,
+    ):
+        """
+        Инициализирует кэширующее хранилище.
+        
+        Args:
+            storage: Хранилище, к которому идут запросы при промахе кэша
+            maxsize: Максимальное количество записей в каждом кэше
+            mode_ttl: Время жизни снимка пользователей в ручном режиме в секундах (0 - не кэшировать)
+        """
+        self.storage = storage
+        self.maxsize = maxsize
+        self.mode_ttl = mode_ttl
+        
+        self._topic_cache: "OrderedDict[int, int]" = OrderedDict()
+        self._user_cache: "OrderedDict[int, int]" = OrderedDict()
+        
+        # Снимок пользователей в ручном режиме и время его загрузки (monotonic)
+        self._manual_users: frozenset[int] = frozenset()
+        self._manual_users_at: float | None = None
+        # После ошибки загрузки снимок не запрашивается до этого момента
+        self._manual_users_retry_at = 0.0
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        """Добавляет значение в LRU-кэш, вытесняя самую старую запись."""
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def save_topic(self, user_id: int, topic_id: int, topic_name: str) -> None:
+        """Сохраняет связь в хранилище и сразу кэширует её в обе стороны."""
+        self.storage.save_topic(user_id, topic_id, topic_name)
+        self._remember(self._topic_cache, user_id, topic_id)
+        self._remember(self._user_cache, topic_id, user_id)
+
+    def get_topic_id(self, user_id: int) -> int | None:
+        """Получает ID топика по ID пользователя (из кэша, если есть)."""
+        topic_id = self._topic_cache.get(user_id)
+        if topic_id is not None:
+            self._topic_cache.move_to_end(user_id)
+            return topic_id
+        
+        topic_id = self.storage.get_topic_id(user_id)
+        # Отсутствие топика не кэшируем: он может быть создан в любой момент
+        if topic_id is not None:
+            self._remember(self._topic_cache, user_id, topic_id)
+            self._remember(self._user_cache, topic_id, user_id)
+        return topic_id
+
+    def get_user_id(self, topic_id: int) -> int | None:
+        """Получает ID пользователя по ID топика (из кэша, если есть)."""
+        user_id = self._user_cache.get(topic_id)
+        if user_id is not None:
+            self._user_cache.move_to_end(topic_id)
+            return user_id
+        
+        user_id = self.storage.get_user_id(topic_id)
+        if user_id is not None:
+            self._remember(self._user_cache, topic_id, user_id)
+            self._remember(self._topic_cache, user_id, topic_id)
+        return user_id
+
+    def _manual_users_snapshot(self) -> frozenset[int] | None:
+        """
+        Возвращает актуальный снимок пользователей в ручном режиме.
+        
+        Returns:
+            Множество ID пользователей или None, если снимок недоступен
+        """
+        now = time.monotonic()
+        if self._manual_users_at is not None and now - self._manual_users_at < self.mode_ttl:
+            return self._manual_users
+        if now < self._manual_users_retry_at:
+            return None
+        
+        try:
+            self._manual_users = frozenset(self.storage.get_manual_user_ids())
+        except Exception as e:
+            logger.warning(
+                "Не удалось загрузить пользователей в ручном режиме, режим читается по одному: %s",
+                str(e),
+            )
+            self._manual_users_at = None
+            self._manual_users_retry_at = now + self.mode_ttl
+            return None
+        
+        self._manual_users_at = now
+        return self._manual_users
+
+    def set_mode(self, user_id: int, mode: str) -> None:
+        """Устанавливает режим в хранилище и обновляет снимок ручного режима."""
+        self.storage.set_mode(user_id, mode)
+        if self._manual_users_at is None:
+            return
+        # Множество заменяется целиком: читатели всегда видят согласованный снимок
+        if mode == "manual":
+            self._manual_users = self._manual_users | {user_id}
+        else:
+            self._manual_users = self._manual_users - {user_id}
+
+    def get_mode(self, user_id: int) -> str:
+        """Получает режим работы (по снимку ручного режима, если он доступен)."""
+        if self.mode_ttl > 0:
+            manual_users = self._manual_users_snapshot()
+            if manual_users is not None:
+                return "manual" if user_id in manual_users else "auto"
+        return self.storage.get_mode(user_id)
+
+    def get_manual_user_ids(self) -> set[int]:
+        """Получает ID всех пользователей в ручном режиме (напрямую из хранилища)."""
+        return self.storage.get_manual_user_ids()
@@ -68,4 +68,12 @@ class BaseTopicStorage(ABC):
         """
         pass
 
-
+    @abstractmethod
+    def get_manual_user_ids(self) -> set[int]:
+        """
+        Получает ID всех пользователей, находящихся в ручном режиме.
+        
+        Returns:
+            Множество ID пользователей с режимом "manual"
+        """
+        pass
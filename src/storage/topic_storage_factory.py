@@ -2,6 +2,8 @@
 
 import logging
 
+from src.config.admin_config import get_admin_mode_cache_ttl
+from src.storage.cached_topic_storage import CachedTopicStorage
 from src.storage.ydb_topic_storage import YDBTopicStorage
 from src.storage.topic_storage import BaseTopicStorage
 
@@ -16,13 +18,17 @@ def get_topic_storage() -> BaseTopicStorage:
     Получает или создает экземпляр хранилища топиков.
     
     Returns:
-        Экземпляр хранилища топиков (по умолчанию YDBTopicStorage)
+        Экземпляр хранилища топиков (по умолчанию YDBTopicStorage с кэшем в памяти)
     """
     global _topic_storage
     
     if _topic_storage is None:
         try:
-            _topic_storage = YDBTopicStorage()
+            # topic_id и режим читаются на каждом сообщении - кэшируем их в памяти процесса
+            _topic_storage = CachedTopicStorage(
+                YDBTopicStorage(),
+                mode_ttl=get_admin_mode_cache_ttl(),
+            )
             logger.info("Инициализирован YDBTopicStorage")
         except ValueError as e:
             logger.error(
@@ -234,3 +234,33 @@ class YDBTopicStorage(BaseTopicStorage):
             # В случае ошибки возвращаем "auto" по умолчанию
             return "auto"
 
+    def get_manual_user_ids(self) -> set[int]:
+        """
+        Получает ID всех пользователей, находящихся в ручном режиме.
+        
+        Returns:
+            Множество ID пользователей с режимом "manual"
+            
+        Raises:
+            RuntimeError: Если YDB вернул неполный результат
+        """
+        try:
+            query = f"""
+            DECLARE $mode AS String;
+            SELECT user_id FROM {self.table_name} WHERE mode = $mode;
+            """
+            
+            result = self.ydb_client._execute_query(query, {"$mode": "manual"})
+            if result[0].truncated:
+                raise RuntimeError("результат запроса усечён")
+            
+            return {
+                int(row.user_id.decode() if isinstance(row.user_id, bytes) else row.user_id)
+                for row in result[0].rows
+            }
+        except Exception as e:
+            logger.error(
+                "Ошибка при получении пользователей в ручном режиме: %s",
+                str(e),
+            )
+            raise